@@ -1,9 +1,36 @@
 #!/usr/bin/env python3
 """Generate dark Matrix-themed wallpapers for omarchy spectre theme."""
 
+import argparse
+import ast
+import base64
+import concurrent.futures
+import fnmatch
+import functools
+import hashlib
+import inspect
+import json
+import multiprocessing
+import os
 import random
 import math
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
+import resource
+import shutil
+import signal
+import socket
+import socketserver
+import statistics
+import struct
+import subprocess
+import sys
+import threading
+import time
+import tomllib
+import zlib
+from dataclasses import dataclass, replace
+from typing import Callable
+import numpy as np
+from PIL import Image, ImageChops, ImageDraw, ImageFont, ImageFilter, features
 
 W, H = 3840, 2160
 BG = (10, 10, 10)
@@ -12,52 +39,1271 @@ MATRIX_CHARS = list("アイウエオカキクケコサシスセソタチツテ
 HEX = "0123456789ABCDEF"
 
 
-def blend(bg, fg, alpha):
+def _mix(bg, fg, alpha):
     return tuple(int(bg[i] * (1 - alpha) + fg[i] * alpha) for i in range(3))
 
 
-def get_font(size):
-    paths = [
-        "/usr/share/fonts/TTF/JetBrainsMonoNerdFont-Bold.ttf",
-        "/usr/share/fonts/TTF/JetBrainsMonoNerdFont-Regular.ttf",
-        "/usr/share/fonts/TTF/JetBrainsMono-Bold.ttf",
-        "/usr/share/fonts/noto/NotoSansMono-Bold.ttf",
-        "/usr/share/fonts/TTF/DejaVuSansMono-Bold.ttf",
-    ]
-    for p in paths:
+class ColorRamp:
+    """``blend(bg, fg, alpha)`` for one (bg, fg) pair, tabulated over alpha.
+
+    Alpha in [0, 1) is split into ``STEPS`` bins.  A bin holds the color
+    every alpha inside it blends to, or None where some channel crosses an
+    integer inside the bin; those alphas fall back to the arithmetic, so a
+    lookup is always exactly what ``_mix`` returns.
+    """
+
+    STEPS = 4096  # a power of two, so alpha * STEPS is exact
+
+    def __init__(self, bg, fg):
+        self.bg = bg
+        self.fg = fg
+        edges = np.arange(self.STEPS + 1)[:, None] / self.STEPS
+        v = np.array(bg, np.float64) * (1 - edges) + np.array(fg, np.float64) * edges
+        # Channels are linear in alpha; a margin far above float error keeps
+        # a bin clear of any integer its rounded arithmetic could land on.
+        lo = np.floor(np.minimum(v[:-1], v[1:]) - 1e-9)
+        hi = np.floor(np.maximum(v[:-1], v[1:]) + 1e-9)
+        self.exact = (lo == hi).all(axis=1)
+        self.colors = lo.astype(np.int32)
+        self.table = [tuple(c) if ok else None
+                      for c, ok in zip(self.colors.tolist(), self.exact.tolist())]
+
+    def __call__(self, alpha):
+        if 0 <= alpha < 1:
+            color = self.table[int(alpha * self.STEPS)]
+            if color is not None:
+                return color
+        return _mix(self.bg, self.fg, alpha)
+
+    def take(self, alphas):
+        """``blend`` over an array of alphas, as an ``(..., 3)`` int32 array."""
+        alphas = np.asarray(alphas, np.float64)
+        inside = (alphas >= 0) & (alphas < 1)
+        bins = np.where(inside, alphas * self.STEPS, 0).astype(np.intp)
+        out = self.colors[bins]
+        slow = ~(inside & self.exact[bins])
+        if slow.any():
+            a = alphas[slow][..., None]
+            out[slow] = (np.array(self.bg) * (1 - a) + np.array(self.fg) * a).astype(np.int32)
+        return out
+
+
+@functools.lru_cache(maxsize=256)
+def color_ramp(bg, fg):
+    """The shared ``ColorRamp`` of a (bg, fg) pair, built on first use."""
+    return ColorRamp(bg, fg)
+
+
+def blend(bg, fg, alpha):
+    """Mix ``fg`` over ``bg`` at ``alpha``, truncating each channel.
+
+    Served from the pair's ``ColorRamp``; colors that are not hashable
+    (lists) are mixed directly.
+    """
+    try:
+        table = color_ramp(bg, fg).table
+    except TypeError:
+        return _mix(bg, fg, alpha)
+    if 0 <= alpha < 1:
+        color = table[int(alpha * ColorRamp.STEPS)]
+        if color is not None:
+            return color
+    return _mix(bg, fg, alpha)
+
+
+FONT_PATHS = [
+    "/usr/share/fonts/TTF/JetBrainsMonoNerdFont-Bold.ttf",
+    "/usr/share/fonts/TTF/JetBrainsMonoNerdFont-Regular.ttf",
+    "/usr/share/fonts/TTF/JetBrainsMono-Bold.ttf",
+    "/usr/share/fonts/noto/NotoSansMono-Bold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSansMono-Bold.ttf",
+]
+
+
+FONT_CACHE_SIZE = 64
+# Design sizes the generators pass to ``ctx.font``; the render daemon loads
+# them before its first request.
+FONT_SIZES = (10, 12, 14, 16, 18, 20, 22, 24, 26, 28, 30, 32, 34, 36, 40, 42, 50, 80, 300)
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_font_path():
+    """Return the font file ``get_font`` picks, or None for PIL's default.
+
+    The probe runs once per process; machines without JetBrains Mono would
+    otherwise pay for the failed opens on every ``get_font`` call.
+    """
+    for p in FONT_PATHS:
         try:
-            return ImageFont.truetype(p, size)
+            ImageFont.truetype(p, 10)
+            return p
         except OSError:
             continue
-    return ImageFont.load_default()
+    return None
+
+
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_font(path, size):
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size)
+
+
+def get_font(size):
+    """Return the theme font at ``size``, parsed once per (file, size)."""
+    return _load_font(resolve_font_path(), size)
+
+
+def font_cache_info():
+    """Hit/miss counters of the ``get_font`` cache."""
+    return _load_font.cache_info()
+
+
+# ─────────────────────────────────────────────────────────────
+# Glyph atlas — rasterize each glyph once, stamp it many times
+# ─────────────────────────────────────────────────────────────
+class GlyphAtlas:
+    """Coverage masks of short strings, keyed by (font, text, subpixel start).
+
+    ``draw.text`` runs FreeType for every call even though the generators
+    draw the same few dozen glyphs tens of thousands of times.  The atlas
+    keeps the mask and bearing offset ``getmask2`` returns so a repeat is
+    a single ``draw_bitmap`` — the exact call ``draw.text`` ends with, so
+    the pixels are identical.
+    """
+
+    MAX_TEXT = 2        # single glyphs plus the hex-dump byte pairs
+    MAX_ENTRIES = 20000  # float positions make one-off keys; stop caching them
+
+    def __init__(self):
+        self._masks = {}
+        self._coverage = {}
+        self._stored = {}
+        self._fresh = {}
+        self.hits = 0
+        self.misses = 0
+
+    def mask(self, font, text, start=(0.0, 0.0)):
+        """Return ``(mask, (dx, dy))`` for ``text`` drawn at fraction ``start``."""
+        key = (font, text, start)
+        entry = self._masks.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        name = (getattr(font, "path", None), font.size, text, *start)
+        stored = self._stored.get(name)
+        if stored is not None:
+            size, offset, data = stored
+            mask = Image.new("L", size)
+            if data:
+                mask.frombytes(base64.b64decode(data))
+            entry = mask.im, tuple(offset)
+        else:
+            entry = font.getmask2(text, "L", anchor="la", start=start)
+            if name[0] is not None:
+                self._fresh[name] = entry
+        if len(self._masks) < self.MAX_ENTRIES:
+            self._masks[key] = entry
+        return entry
+
+    def coverage(self, font, text):
+        """Return ``(ys, xs, m)`` arrays of the nonzero mask pixels of ``text``.
+
+        Coordinates already include the bearing offset, so a glyph anchored
+        at (x, y) covers pixels ``(y + ys, x + xs)``.
+        """
+        key = (font, text)
+        entry = self._coverage.get(key)
+        if entry is None:
+            mask, (dx, dy) = self.mask(font, text)
+            m = np.asarray(Image.Image()._new(mask))
+            ys, xs = np.nonzero(m)
+            entry = (ys + dy, xs + dx, m[ys, xs].astype(np.int32))
+            self._coverage[key] = entry
+        return entry
+
+    def clear(self):
+        self._masks.clear()
+        self._coverage.clear()
+        self._stored.clear()
+        self._fresh.clear()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _stamp():
+        # Masks only carry over between identical rasterizers and fonts.
+        return [Image.__version__, features.version("freetype2"), _font_digest()]
+
+    def load(self, path):
+        """Take the masks ``save`` left in ``path`` instead of rasterizing them again.
+
+        A missing, unreadable or stale file (another font, Pillow or
+        FreeType) is ignored.
+        """
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("stamp") != self._stamp():
+            return
+        for font, size, text, sx, sy, mask_size, offset, pixels in data["masks"]:
+            self._stored[(font, size, text, sx, sy)] = (tuple(mask_size), offset, pixels)
+
+    def save(self, path):
+        """Add the masks rasterized since ``load`` to ``path``, shared by every render.
+
+        Concurrent savers each replace the file whole, so one may drop
+        another's additions; they are only rasterized again next time.
+        """
+        if not self._fresh:
+            return
+        self._stored.clear()
+        self.load(path)
+        for name, (mask, offset) in self._fresh.items():
+            pixels = base64.b64encode(Image.Image()._new(mask).tobytes()).decode()
+            self._stored[name] = (mask.size, offset, pixels)
+        self._fresh.clear()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"stamp": self._stamp(),
+                       "masks": [[*name, *entry] for name, entry in self._stored.items()]}, f)
+        os.replace(tmp, path)
+
+
+GLYPHS = GlyphAtlas()
+
+
+class GlyphDraw(ImageDraw.ImageDraw):
+    """ImageDraw whose single-glyph ``text`` calls go through ``GLYPHS``.
+
+    Anything the atlas does not cover (long strings, non-FreeType fonts,
+    anchors or strokes) falls back to ``ImageDraw.text`` unchanged.
+    """
+
+    def text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        if (args or kwargs or len(text) > GlyphAtlas.MAX_TEXT or "\n" in text
+                or self.fontmode != "L"
+                or not isinstance(font, ImageFont.FreeTypeFont)):
+            super().text(xy, text, fill, font, *args, **kwargs)
+            return
+        ink, fill_ink = self._getink(fill)
+        if ink is None:
+            ink = fill_ink
+        if ink is None:
+            return
+        x, y = xy
+        start = (math.modf(x)[0], math.modf(y)[0])
+        mask, (dx, dy) = GLYPHS.mask(font, text, start)
+        self.draw.draw_bitmap((int(x) + dx, int(y) + dy), mask, ink)
+
+
+# ─────────────────────────────────────────────────────────────
+# Scatter layer — batched background glyphs
+# ─────────────────────────────────────────────────────────────
+def stamp_glyphs(img, xs, ys, texts, inks, font, origin=(0, 0)):
+    """Composite many glyphs into ``img`` with NumPy, in draw order.
+
+    ``xs``/``ys`` are pixel anchors, ``texts`` the string drawn at each and
+    ``inks`` an ``(n, 3)`` integer array of fill colors.  The result is byte-identical to calling
+    ``draw.text`` for each glyph in turn: every covered pixel gets PIL's
+    ``out * (255 - m) + ink * m`` blend with the same /255 rounding, and
+    pixels hit by several glyphs are blended rank by rank in draw order.
+    Only the bounding box of the covered pixels is copied out and pasted
+    back.  ``origin`` is the frame position of ``img``'s corner when it is
+    one tile.
+    """
+    width, height = img.size
+    n = len(texts)
+    if n == 0:
+        return
+    xs = np.asarray(xs, dtype=np.int64) - origin[0]
+    ys = np.asarray(ys, dtype=np.int64) - origin[1]
+    inks = np.asarray(inks, dtype=np.int32)
+
+    by_text = {}
+    for i, text in enumerate(texts):
+        by_text.setdefault(text, []).append(i)
+    pix_parts, order_parts, cov_parts = [], [], []
+    for text, idx in by_text.items():
+        gy, gx, gm = GLYPHS.coverage(font, text)
+        if len(gm) == 0:
+            continue
+        idx = np.asarray(idx, dtype=np.int64)
+        py = ys[idx, None] + gy[None, :]
+        px = xs[idx, None] + gx[None, :]
+        inside = (py >= 0) & (py < height) & (px >= 0) & (px < width)
+        pix_parts.append((py * width + px)[inside])
+        order_parts.append(np.broadcast_to(idx[:, None], py.shape)[inside])
+        cov_parts.append(np.broadcast_to(gm[None, :], py.shape)[inside])
+    if not pix_parts:
+        return
+    pix = np.concatenate(pix_parts)
+    order = np.concatenate(order_parts)
+    cov = np.concatenate(cov_parts)
+
+    # Sort by pixel, then by draw order, and number each pixel's hits.
+    sort = np.argsort(pix * n + order)
+    pix, order, cov = pix[sort], order[sort], cov[sort]
+    first = np.ones(len(pix), dtype=bool)
+    first[1:] = pix[1:] != pix[:-1]
+    starts = np.flatnonzero(first)
+    group = np.cumsum(first) - 1
+    rank = np.arange(len(pix)) - starts[group]
+
+    # Work on the bounding box of the touched pixels only.
+    touched = pix[starts]
+    rows, cols = np.divmod(touched, width)
+    x0, x1 = int(cols.min()), int(cols.max()) + 1
+    y0, y1 = int(rows[0]), int(rows[-1]) + 1
+    box = (x0, y0, x1, y1)
+    canvas = np.array(img.crop(box)).reshape(-1, 3)
+    touched = (rows - y0) * (x1 - x0) + (cols - x0)
+    # First hits cover every touched pixel once, in pixel order; later
+    # ranks (overlapping glyphs) are rare and go through a gather.
+    m = cov[starts, None]
+    t = canvas[touched].astype(np.int32) * (255 - m) + inks[order[starts]] * m + 128
+    values = ((t >> 8) + t) >> 8
+    for r in range(1, int(rank.max()) + 1):
+        sel = np.flatnonzero(rank == r)
+        g, m = group[sel], cov[sel, None]
+        t = values[g] * (255 - m) + inks[order[sel]] * m + 128
+        values[g] = ((t >> 8) + t) >> 8
+    canvas[touched] = values
+    img.paste(Image.fromarray(canvas.reshape(y1 - y0, x1 - x0, 3)), box)
+
+
+def scatter_glyphs(ctx, img, draw, count, chars, color, alpha_range, font, alpha_first=True):
+    """Scatter ``count`` faint glyphs over the whole canvas in one batch.
+
+    Replaces the loop most generators open with::
+
+        for _ in range(count):
+            x = random.randint(0, W)
+            y = random.randint(0, H)
+            a = random.uniform(*alpha_range)
+            draw.text((x, y), random.choice(chars), fill=blend(BG, color, a), font=font)
+
+    ``alpha_first=False`` is the variant that picks the glyph before the
+    alpha.  With ``ctx.exact`` (the default) the positions, glyphs and
+    alphas come from ``random`` in exactly that order and are drawn through
+    the glyph atlas, so the layer and everything after it match the loop
+    bit for bit.  Otherwise they are drawn as NumPy arrays from a generator
+    seeded off ``random`` and composited in bulk by ``stamp_glyphs`` — a
+    different (equally random) layer, and at 4K no faster than the atlas.
+    """
+    lo, hi = alpha_range
+    if ctx.exact:
+        randint, uniform, choice = random.randint, random.uniform, random.choice
+        text = draw.text
+        for _ in range(count):
+            x = randint(0, ctx.W)
+            y = randint(0, ctx.H)
+            if alpha_first:
+                a = uniform(lo, hi)
+                ch = choice(chars)
+            else:
+                ch = choice(chars)
+                a = uniform(lo, hi)
+            text((x, y), ch, fill=blend(BG, color, a), font=font)
+        return
+    rng = np.random.default_rng(random.getrandbits(64))
+    xs = rng.integers(0, ctx.W, count, endpoint=True)
+    ys = rng.integers(0, ctx.H, count, endpoint=True)
+    alphas = rng.uniform(lo, hi, count)
+    glyphs = [chars[i] for i in rng.integers(0, len(chars), count)]
+    inks = color_ramp(BG, color).take(alphas)
+    if ctx.scale != 1:
+        xs = np.round(xs * ctx.scale)
+        ys = np.round(ys * ctx.scale)
+    if isinstance(img, DrawList):
+        img.record(stamp_glyphs, (xs, ys, glyphs, inks, font), {})
+        return
+    stamp_glyphs(img, xs, ys, glyphs, inks, font)
+
+
+# ─────────────────────────────────────────────────────────────
+# Shape masks — implicit shapes evaluated over a whole grid
+# ─────────────────────────────────────────────────────────────
+class ShapeGrid:
+    """The ``step``-spaced cell anchors a shape fill walks, as NumPy arrays.
+
+    ``x``/``y`` are ``(rows, cols)`` integer arrays laid out like the nested
+    ``for y in ys: for x in xs:`` loop they replace.  Shape predicates and
+    edge-distance fields are written with array operators, so ``eval`` runs
+    them over every cell at once, and ``cells`` then walks only the cells a
+    mask selects, in the same row-major order the loop visited them.
+    """
+
+    def __init__(self, xs, ys):
+        self.x, self.y = np.meshgrid(np.asarray(xs), np.asarray(ys))
+
+    def eval(self, func):
+        """Return ``func(x, y)`` over the grid.
+
+        Branches of a shape are computed everywhere and masked afterwards,
+        so NaNs from out-of-domain cells are expected and not warned about.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return func(self.x, self.y)
+
+    def cells(self, mask, *fields):
+        """Yield ``(x, y, *field values)`` for each cell where ``mask`` is set."""
+        columns = [self.x[mask].tolist(), self.y[mask].tolist()]
+        columns += [np.broadcast_to(f, mask.shape)[mask].tolist() for f in fields]
+        return zip(*columns)
+
+
+# ─────────────────────────────────────────────────────────────
+# Spatial index — neighbor queries over scattered points
+# ─────────────────────────────────────────────────────────────
+class GridIndex:
+    """Integer points bucketed into ``cell``-sized squares.
+
+    A radius query only looks at the buckets the radius can reach, so with
+    the cell about as large as the radius each lookup touches a roughly
+    constant number of points and querying every point is linear in their
+    count rather than quadratic.
+    """
+
+    def __init__(self, points, cell):
+        self.points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        self.cell = cell
+        keys = self.points // cell
+        order = np.lexsort((keys[:, 1], keys[:, 0]))
+        cuts = np.flatnonzero(np.any(np.diff(keys[order], axis=0), axis=1)) + 1
+        self.buckets = {tuple(keys[group[0]].tolist()): np.sort(group)
+                        for group in np.split(order, cuts) if len(group)}
+
+    def near(self, x, y, radius):
+        """Indices of the points within ``radius`` of ``(x, y)``, with their squared distances."""
+        reach = math.ceil(radius / self.cell)
+        cx, cy = x // self.cell, y // self.cell
+        found = [self.buckets[(bx, by)]
+                 for bx in range(cx - reach, cx + reach + 1)
+                 for by in range(cy - reach, cy + reach + 1) if (bx, by) in self.buckets]
+        if not found:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        idx = np.concatenate(found)
+        d2 = ((self.points[idx] - (x, y)) ** 2).sum(axis=1)
+        keep = d2 <= radius * radius
+        return idx[keep], d2[keep]
+
+    def nearest(self, x, y, k, radius):
+        """The ``k`` points nearest ``(x, y)`` within ``radius``, closest first.
+
+        Ranked by ``math.hypot`` distance with ties going to the lower index,
+        which is the order ``sorted(range(n), key=distance)`` gives over all
+        points — the query point itself included, if it is one of them.
+        Rings of buckets are searched outward only until ``k`` points lie
+        closer than anything unsearched, so a cell sized to hold a few
+        points keeps each query cheap however many points share the radius.
+        """
+        cx, cy = x // self.cell, y // self.cell
+        found = [np.empty(0, np.int64)]
+        for ring in range(math.ceil(radius / self.cell) + 1):
+            found += [self.buckets[key] for key in _ring(cx, cy, ring) if key in self.buckets]
+            idx = np.concatenate(found)
+            d2 = ((self.points[idx] - (x, y)) ** 2).sum(axis=1)
+            # Everything outside the rings searched so far is at least
+            # ``ring * cell`` away.
+            if len(idx) >= k and np.partition(d2, k - 1)[k - 1] < (ring * self.cell) ** 2:
+                break
+        keep = d2 <= radius * radius
+        idx, d2 = idx[keep], d2[keep]
+        if len(idx) > k:
+            # Squared integer distances preselect exactly; every point tied
+            # with the k-th stays in so the final ranking can split the tie.
+            idx = idx[d2 <= np.partition(d2, k - 1)[k - 1]]
+        px, py = self.points[idx].T.tolist()
+        dist = {j: math.hypot(u - x, v - y) for j, u, v in zip(idx.tolist(), px, py)}
+        return sorted(dist, key=lambda j: (dist[j], j))[:k]
+
+
+def _ring(cx, cy, r):
+    """The bucket keys ``r`` cells out from ``(cx, cy)``, as a square ring."""
+    if r == 0:
+        return [(cx, cy)]
+    return ([(bx, by) for bx in range(cx - r, cx + r + 1) for by in (cy - r, cy + r)]
+            + [(bx, by) for by in range(cy - r + 1, cy + r) for bx in (cx - r, cx + r)])
+
+
+# ─────────────────────────────────────────────────────────────
+# Phase tracing — where each generator spends its time
+# ─────────────────────────────────────────────────────────────
+class PhaseTrace:
+    """Wall time and draw calls of each labelled phase of one render.
+
+    Generators mark where a phase begins with ``ctx.phase(name)``; it runs
+    until the next mark or the end of the render.  Without a trace the
+    context's ``phase`` is a no-op and the draw handle is not wrapped, so an
+    untraced render pays one attribute check per phase.
+    """
+
+    def __init__(self):
+        self.phases = []
+        self.calls = 0
+        self._name = None
+        self._start = 0.0
+        self._calls_at_start = 0
+
+    def mark(self, name):
+        """End the current phase and start ``name`` (None just ends it)."""
+        now = time.perf_counter()
+        if self._name is not None:
+            self.add(self._name, now - self._start, self.calls - self._calls_at_start)
+        self._name, self._start, self._calls_at_start = name, now, self.calls
+
+    def add(self, name, seconds, calls=0):
+        self.phases.append({"name": name, "seconds": seconds, "draw_calls": calls})
+
+    def summary(self):
+        """Seconds and draw calls per phase name, in first-seen order."""
+        totals = {}
+        for ph in self.phases:
+            entry = totals.setdefault(ph["name"], {"seconds": 0.0, "draw_calls": 0})
+            entry["seconds"] += ph["seconds"]
+            entry["draw_calls"] += ph["draw_calls"]
+        return totals
+
+    def folded(self, root):
+        """Folded-stack lines (``root;phase microseconds``) for flamegraph.pl."""
+        return [f"{root};{name} {round(st['seconds'] * 1e6)}"
+                for name, st in self.summary().items()]
+
+
+class TracedDraw:
+    """Draw-handle mixin counting every drawing call into ``self.trace``."""
+
+    trace = None
+
+    def text(self, *args, **kwargs):
+        self.trace.calls += 1
+        return super().text(*args, **kwargs)
+
+    def line(self, *args, **kwargs):
+        self.trace.calls += 1
+        return super().line(*args, **kwargs)
+
+    def ellipse(self, *args, **kwargs):
+        self.trace.calls += 1
+        return super().ellipse(*args, **kwargs)
+
+    def rectangle(self, *args, **kwargs):
+        self.trace.calls += 1
+        return super().rectangle(*args, **kwargs)
+
+    def point(self, *args, **kwargs):
+        self.trace.calls += 1
+        return super().point(*args, **kwargs)
+
+
+# ─────────────────────────────────────────────────────────────
+# Render context — resolution-independent drawing
+# ─────────────────────────────────────────────────────────────
+class ScaledDraw(GlyphDraw):
+    """ImageDraw that takes design-unit coordinates and scales them to pixels.
+
+    Fonts are scaled separately by ``RenderContext.font``, so ``text`` only
+    moves the anchor point and ``textlength`` reports design units.
+    """
+
+    def __init__(self, im, scale):
+        super().__init__(im)
+        self.scale = scale
+
+    def _xy(self, xy):
+        s = self.scale
+        if isinstance(xy[0], (tuple, list)):
+            return [(x * s, y * s) for x, y in xy]
+        return [v * s for v in xy]
+
+    def _width(self, width):
+        return max(1, round(width * self.scale))
+
+    def text(self, xy, text, fill=None, font=None, *args, **kwargs):
+        # Whole-pixel anchors keep scaled glyphs on the atlas fast path.
+        x, y = self._xy(xy)
+        super().text((round(x), round(y)), text, fill, font, *args, **kwargs)
+
+    def textlength(self, text, font=None, *args, **kwargs):
+        return super().textlength(text, font, *args, **kwargs) / self.scale
+
+    def line(self, xy, fill=None, width=0, joint=None):
+        super().line(self._xy(xy), fill, self._width(width) if width else 0, joint)
+
+    def ellipse(self, xy, fill=None, outline=None, width=1):
+        super().ellipse(self._xy(xy), fill, outline, self._width(width))
+
+    def rectangle(self, xy, fill=None, outline=None, width=1):
+        super().rectangle(self._xy(xy), fill, outline, self._width(width))
+
+    def point(self, xy, fill=None):
+        if self.scale < 1.5:
+            super().point(self._xy(xy), fill)
+            return
+        # Keep dotted rays and sparkles visible on high-DPI outputs.
+        x, y = self._xy(xy)
+        super().rectangle([x, y, x + self.scale - 1, y + self.scale - 1], fill)
+
+
+class TracedGlyphDraw(TracedDraw, GlyphDraw):
+    pass
+
+
+class TracedScaledDraw(TracedDraw, ScaledDraw):
+    pass
+
+
+class RenderContext:
+    """Output size of one render and the design-unit scale to reach it.
+
+    Generators are written for a ``W x H`` (3840x2160) design canvas.  The
+    context scales that canvas uniformly to fit the requested size and widens
+    the design space along the spare axis, so a 21:9 or 16:10 output gets
+    more room instead of a squashed composition.  ``ctx.W``/``ctx.H`` are the
+    design-unit dimensions generators lay out against.
+
+    ``exact`` asks batched layers to consume ``random`` exactly like the
+    loops they replaced, keeping output byte-identical to the shipped set.
+    ``trace`` is an optional ``PhaseTrace`` to record phases into.  A
+    ``record`` context draws nothing: its canvas is a ``DrawList`` to be
+    replayed strip by strip.
+    """
+
+    def __init__(self, width=W, height=H, exact=True, trace=None, record=False):
+        self.width = width
+        self.height = height
+        self.exact = exact
+        self.trace = trace
+        self.record = record
+        self.scale = min(width / W, height / H)
+        self.W = round(width / self.scale)
+        self.H = round(height / self.scale)
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    @property
+    def screens(self):
+        """Design canvas area in ``W x H`` screens: 1 at 16:9, more when wider."""
+        return self.W * self.H / (W * H)
+
+    def canvas(self):
+        """Return a blank output-sized image and a draw handle for it."""
+        if self.record:
+            canvas = DrawList(self)
+            return canvas, RecordingDraw(canvas)
+        img = Image.new("RGB", self.size, BG)
+        if self.trace is None:
+            if self.scale == 1:
+                return img, GlyphDraw(img)
+            return img, ScaledDraw(img, self.scale)
+        if self.scale == 1:
+            draw = TracedGlyphDraw(img)
+        else:
+            draw = TracedScaledDraw(img, self.scale)
+        draw.trace = self.trace
+        return img, draw
+
+    def phase(self, name):
+        """Mark the start of phase ``name`` of the render."""
+        if self.trace is not None:
+            self.trace.mark(name)
+
+    def font(self, size):
+        return get_font(max(1, round(size * self.scale)))
+
+    def blur(self, img, radius):
+        self.phase("blur")
+        if isinstance(img, DrawList):
+            img.blur(radius * self.scale)
+            return img
+        return img.filter(ImageFilter.GaussianBlur(radius=radius * self.scale))
+
+    def glow(self, img, center, radius, color, alpha, power=2, origin=(0, 0)):
+        """Add a radial glow of ``color`` around ``center``, in place.
+
+        The light falls off as ``alpha * (1 - r / radius) ** power`` and is
+        added (saturating) to what is already drawn, so glyphs under a halo
+        brighten instead of being painted over.  At any given distance the
+        light rounds to a few integer levels per channel, so the layer is
+        drawn as nested filled discs, one per level, and added with
+        ``ImageChops.add`` over the rows of the disc only.  ``origin`` is the
+        frame position of ``img``'s corner when it is one tile.
+        """
+        if self.trace is not None:
+            self.trace.calls += 1
+        s = self.scale
+        cx, cy, r_max = center[0] * s, center[1] * s, radius * s
+        # Radius inside which channel c reaches level k (rounds to >= k).
+        levels = [[r_max * (1 - ((k - 0.5) / (alpha * c)) ** (1 / power))
+                   for k in range(1, math.floor(alpha * c + 0.5) + 1)] for c in color]
+        radii = sorted({r for rs in levels for r in rs}, reverse=True)
+        if not radii:
+            return
+        reach = radii[0]
+        if isinstance(img, DrawList):
+            img.record(self.glow, (center, radius, color, alpha, power), {},
+                       (cx - reach - 1, cy - reach - 1, cx + reach + 1, cy + reach + 1))
+            return
+        left, top = origin
+        gx0, gy0 = math.floor(cx - reach), math.floor(cy - reach)
+        x0, y0 = max(left, gx0), max(top, gy0)
+        x1 = min(left + img.width, math.ceil(cx + reach) + 1)
+        y1 = min(top + img.height, math.ceil(cy + reach) + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        # The layer starts at the glow's own corner, not the tile's: PIL
+        # rasterizes a disc cut off at the top or left differently, so a
+        # tile-anchored layer would not match the full render.
+        layer = Image.new("RGB", (x1 - gx0, y1 - gy0))
+        draw = ImageDraw.Draw(layer)
+        lx, ly = cx - gx0, cy - gy0
+        for r in radii:
+            fill = tuple(sum(t >= r for t in rs) for rs in levels)
+            draw.ellipse([lx - r, ly - r, lx + r, ly + r], fill=fill)
+        # Add in row bands trimmed to the circle's chord: the box corners
+        # hold no light, and the add is what dominates the cost.  Bands are
+        # counted from the glow's corner and padded by a pixel, which the
+        # rasterized discs can reach past ``reach``.
+        edge = reach + 1
+        for by0 in range(gy0 + (y0 - gy0) // 64 * 64, y1, 64):
+            by0, by1 = max(by0, y0), min(by0 + 64, y1)
+            dy = max(0, by0 - cy, cy - (by1 - 1))
+            if dy >= edge:
+                continue
+            half = math.sqrt(edge * edge - dy * dy)
+            bx0, bx1 = max(x0, math.floor(cx - half)), min(x1, math.ceil(cx + half) + 1)
+            box = (bx0 - left, by0 - top, bx1 - left, by1 - top)
+            light = layer.crop((bx0 - gx0, by0 - gy0, bx1 - gx0, by1 - gy0))
+            img.paste(ImageChops.add(img.crop(box), light), box)
+
+    def rays(self, img, center, angles, radii, color, alpha, power, falloff=None,
+             stretch=1, where=None, floor=0.0, segments=False, origin=(0, 0)):
+        """Draw light rays out of ``center``, one per angle in ``angles`` (degrees).
+
+        Each ray is a dot every ``radii[2]`` design units over
+        ``range(*radii)`` in ``blend(BG, color, a)``, where
+        ``a = alpha * (1 - (r - f0) / (f1 - f0)) ** power`` for ``falloff``
+        ``(f0, f1)`` (default ``(0, radii[1])``).  Dots with ``a <= floor``,
+        off the canvas or outside ``where(xs, ys)`` are skipped; x offsets
+        are scaled by ``stretch``.  All dots are computed as arrays and
+        written at once, with the same pixels as ``draw.point`` one by one.
+
+        ``segments`` draws each ray as a continuous anti-aliased line
+        instead, splatted with the same total light and added onto the
+        canvas like ``glow``.  It is a different look, not a shortcut: about
+        0.3 s per call at 4K against a few ms for the dots.
+        """
+        start, stop, step = radii
+        f0, f1 = falloff or (0, stop)
+        s = self.scale
+        if isinstance(img, DrawList):
+            reach = stop * max(1, abs(stretch)) * s + 2 * s + 2
+            img.record(self.rays, (center, angles, radii, color, alpha, power),
+                       dict(falloff=falloff, stretch=stretch, where=where, floor=floor,
+                            segments=segments),
+                       (center[0] * s - reach, center[1] * s - reach,
+                        center[0] * s + reach, center[1] * s + reach))
+            return
+        if self.trace is not None:
+            self.trace.calls += 1
+        theta = [math.radians(d) for d in angles]
+        cos = np.array([math.cos(t) for t in theta])[:, None]
+        sin = np.array([math.sin(t) for t in theta])[:, None]
+        if segments:
+            self._ray_segments(img, center, cos, sin, radii, (f0, f1), color, alpha, power,
+                               stretch, where, floor, origin)
+            return
+
+        # Alpha and color depend on the radius only: one blend() per radius.
+        r = [v for v in range(start, stop, step)
+             if alpha * (1 - (v - f0) / (f1 - f0)) ** power > floor]
+        if not r:
+            return
+        inks = np.array([blend(BG, color, alpha * (1 - (v - f0) / (f1 - f0)) ** power)
+                         for v in r], np.uint8)
+        rs = np.array(r, np.float64)
+        xs = center[0] + np.trunc(rs * cos * stretch)
+        ys = center[1] + np.trunc(rs * sin)
+        inks = np.broadcast_to(inks, xs.shape + (3,))
+        keep = (xs >= 0) & (xs < self.W) & (ys >= 0) & (ys < self.H)
+        if where is not None:
+            keep &= where(xs, ys)
+        xs, ys, inks = xs[keep], ys[keep], inks[keep]
+        if s < 1.5:
+            px, py = np.trunc(xs * s), np.trunc(ys * s)
+        else:
+            # ScaledDraw draws each dot as a scale-sized rectangle.
+            x0, y0 = xs * s, ys * s
+            x1, y1 = np.trunc(x0 + s - 1), np.trunc(y0 + s - 1)
+            x0, y0 = np.trunc(x0), np.trunc(y0)
+            k = math.ceil(s)
+            ox = np.arange(k)[None, :, None]
+            oy = np.arange(k)[None, None, :]
+            px = np.broadcast_to(x0[:, None, None] + ox, (len(xs), k, k))
+            py = np.broadcast_to(y0[:, None, None] + oy, (len(xs), k, k))
+            inside = (px <= x1[:, None, None]) & (py <= y1[:, None, None])
+            inks = np.broadcast_to(inks[:, None, None], (len(xs), k, k, 3))[inside]
+            px, py = px[inside], py[inside]
+        px = px.astype(np.intp) - origin[0]
+        py = py.astype(np.intp) - origin[1]
+        on = (px >= 0) & (px < img.width) & (py >= 0) & (py < img.height)
+        px, py, inks = px[on], py[on], inks[on]
+        if not len(px):
+            return
+        # Later dots overwrite earlier ones, as sequential draws would; the
+        # surviving pixels are then set one color at a time.
+        _, last = np.unique((py * img.width + px)[::-1], return_index=True)
+        last = len(px) - 1 - last
+        xy = np.stack([px[last], py[last]], axis=1)
+        inks = inks[last].astype(np.int32)
+        key = (inks[:, 0] << 16) | (inks[:, 1] << 8) | inks[:, 2]
+        order = np.argsort(key, kind="stable")
+        groups = np.split(order, np.flatnonzero(np.diff(key[order])) + 1)
+        draw = ImageDraw.Draw(img)
+        for group in groups:
+            draw.point(xy[group].ravel().tolist(), fill=tuple(inks[group[0]].tolist()))
+
+    def _ray_segments(self, img, center, cos, sin, radii, falloff, color, alpha, power,
+                      stretch, where, floor, origin):
+        start, stop, step = radii
+        f0, f1 = falloff
+        s = self.scale
+        # One sample per output pixel, carrying the light of 1/step of a dot.
+        rs = np.arange(start, stop, 1 / s)
+        a = alpha * np.maximum(1 - (rs - f0) / (f1 - f0), 0) ** power
+        rs, a = rs[a > floor], a[a > floor] / (step * s)
+        xs = center[0] + rs * cos * stretch
+        ys = center[1] + rs * sin
+        a = np.broadcast_to(a, xs.shape)
+        keep = (xs >= 0) & (xs < self.W) & (ys >= 0) & (ys < self.H)
+        if where is not None:
+            keep &= where(xs, ys)
+        px, py, a = xs[keep] * s - origin[0], ys[keep] * s - origin[1], a[keep]
+        ix, iy = np.floor(px).astype(np.intp), np.floor(py).astype(np.intp)
+        fx, fy = px - ix, py - iy
+        width, height = img.size
+        idx, weight = [], []
+        for dx, dy, w in ((0, 0, (1 - fx) * (1 - fy)), (1, 0, fx * (1 - fy)),
+                          (0, 1, (1 - fx) * fy), (1, 1, fx * fy)):
+            x, y = ix + dx, iy + dy
+            on = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+            idx.append(y[on] * width + x[on])
+            weight.append((a * w)[on])
+        idx = np.concatenate(idx)
+        if not len(idx):
+            return
+        weight = np.concatenate(weight)
+        lo, hi = int(idx.min()) // width, int(idx.max()) // width + 1
+        light = np.bincount(idx - lo * width, weight, (hi - lo) * width)
+        light = np.rint(light[:, None] * np.array(color)).clip(0, 255).astype(np.uint8)
+        band = Image.fromarray(light.reshape(hi - lo, width, 3))
+        box = (0, lo, width, hi)
+        img.paste(ImageChops.add(img.crop(box), band), box)
+
+    def gradient(self, img, profile, color, mode="add", axis="y", origin=(0, 0)):
+        """Composite ``color`` across the frame with a strength varying along ``axis``, in place.
+
+        ``profile(t)`` maps an array of design-unit coordinates, one per
+        pixel row (``axis="y"``) or column (``"x"``), to alphas; that 1-D
+        profile is broadcast over the rows or columns it reaches and applied
+        in one pass.  ``"add"`` adds the light ``blend(BG, color, a) - BG``
+        the band lays over bare background, so text under it brightens
+        instead of being painted over; ``"multiply"`` multiplies by
+        ``color`` at opacity ``a``, so black dims what is underneath.
+        """
+        if mode not in ("add", "multiply"):
+            raise ValueError(f"unknown blend mode {mode!r}")
+        rows = axis == "y"
+        if isinstance(img, DrawList):
+            hit = np.flatnonzero(profile(np.arange(self.height if rows else self.width) / self.scale))
+            if len(hit):
+                lo, hi = int(hit[0]), int(hit[-1]) + 1
+                img.record(self.gradient, (profile, color, mode, axis), {},
+                           (0, lo, self.width, hi) if rows else (lo, 0, hi, self.height))
+            return
+        if self.trace is not None:
+            self.trace.calls += 1
+        start, length = (origin[1], img.height) if rows else (origin[0], img.width)
+        a = np.broadcast_to(profile(np.arange(start, start + length) / self.scale), (length,))
+        hit = np.flatnonzero(a)
+        if not len(hit):
+            return
+        lo, hi = int(hit[0]), int(hit[-1]) + 1
+        a = a[hit]
+        if mode == "add":
+            layer = color_ramp(BG, color).take(a) - np.array(BG)
+        else:
+            layer = 1 - a[:, None] * (1 - np.array(color) / 255)
+        box = (0, lo, img.width, hi) if rows else (lo, 0, hi, img.height)
+        region = np.array(img.crop(box))
+        if not rows:
+            region = region.swapaxes(0, 1)
+        band = region[hit - lo]
+        if mode == "add":
+            band = band + layer[:, None].astype(np.int16)
+        else:
+            band = band * layer[:, None]
+        region[hit - lo] = band.clip(0, 255).astype(np.uint8)
+        if not rows:
+            region = np.ascontiguousarray(region.swapaxes(0, 1))
+        img.paste(Image.fromarray(region), box)
+
+
+def parse_size(text):
+    """Parse ``WIDTHxHEIGHT`` (e.g. ``2560x1440``) into a pair of ints."""
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive, got {text!r}")
+    return width, height
+
+
+# ─────────────────────────────────────────────────────────────
+# Tiled rendering — tiles replayed from a recorded draw list
+# ─────────────────────────────────────────────────────────────
+def _xs(xy):
+    """The x coordinates of a PIL ``xy`` argument (pairs or a flat list)."""
+    if isinstance(xy[0], (tuple, list)):
+        return [p[0] for p in xy]
+    return xy[0::2]
+
+
+def _ys(xy):
+    """The y coordinates of a PIL ``xy`` argument (pairs or a flat list)."""
+    if isinstance(xy[0], (tuple, list)):
+        return [p[1] for p in xy]
+    return xy[1::2]
+
+
+class _TileCore:
+    """Proxy for a draw handle's ``ImagingDraw`` that moves everything by ``-origin``.
+
+    PIL truncates every coordinate to int before rasterizing; truncating
+    here first and then shifting keeps a tile's pixels identical to the
+    same pixels of a whole-frame render, even for shapes starting outside it.
+    """
+
+    def __init__(self, core, origin):
+        self.core = core
+        self.left, self.top = origin
+
+    def _shift(self, xy):
+        left, top = self.left, self.top
+        if isinstance(xy[0], (tuple, list)):
+            return [(int(x) - left, int(y) - top) for x, y in xy]
+        return [int(v) - (top if i % 2 else left) for i, v in enumerate(xy)]
+
+    def draw_ink(self, ink):
+        return self.core.draw_ink(ink)
+
+    def draw_bitmap(self, xy, bitmap, ink):
+        self.core.draw_bitmap(tuple(self._shift(xy)), bitmap, ink)
+
+    def draw_lines(self, xy, *args):
+        self.core.draw_lines(self._shift(xy), *args)
+
+    def draw_ellipse(self, xy, *args):
+        self.core.draw_ellipse(self._shift(xy), *args)
+
+    def draw_rectangle(self, xy, *args):
+        self.core.draw_rectangle(self._shift(xy), *args)
+
+    def draw_points(self, xy, *args):
+        self.core.draw_points(self._shift(xy), *args)
+
+
+class DrawList:
+    """A render recorded as a list of operations instead of a canvas.
+
+    A recording ``RenderContext`` hands generators a ``DrawList`` and a
+    ``RecordingDraw`` in place of the image and its draw handle; ``glow``,
+    the NumPy glyph stamp and ``blur`` record themselves too.  Each
+    operation keeps the frame box it can touch, so ``render_box`` replays
+    only what reaches the tile.
+    """
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.width, self.height = ctx.size
+        self.ops = []
+        self.boxes = []
+        self.margin = 0
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def record(self, op, args, kwargs, box=(-math.inf,) * 2 + (math.inf,) * 2):
+        """Append ``op`` (a draw method name or a function taking the image first)."""
+        self.ops.append((op, args, kwargs))
+        self.boxes.append(box)
+
+    def blur(self, radius):
+        # Three box passes, each reaching at most ceil(radius) + 2 pixels.
+        self.margin += 3 * (math.ceil(radius) + 2)
+        self.record("blur", (radius,), {})
+
+    def _draw(self, img, origin):
+        if self.ctx.scale == 1:
+            draw = GlyphDraw(img)
+        else:
+            draw = ScaledDraw(img, self.ctx.scale)
+        draw.draw = _TileCore(draw.draw, origin)
+        return draw
+
+    def render_box(self, box):
+        """Replay the frame pixels inside ``box`` (left, top, right, bottom) into a new image.
+
+        The tile is drawn ``margin`` pixels larger on each side, so blurring
+        it sees the same neighbourhood the whole frame would.
+        """
+        left, top, right, bottom = box
+        m = self.margin
+        x0, y0 = max(0, left - m), max(0, top - m)
+        x1, y1 = min(self.width, right + m), min(self.height, bottom + m)
+        img = Image.new("RGB", (x1 - x0, y1 - y0), BG)
+        draw = self._draw(img, (x0, y0))
+        boxes = np.array(self.boxes).reshape(-1, 4)
+        hit = ((boxes[:, 2] >= x0) & (boxes[:, 0] < x1)
+               & (boxes[:, 3] >= y0) & (boxes[:, 1] < y1))
+        for k in np.flatnonzero(hit):
+            op, args, kwargs = self.ops[k]
+            if op == "blur":
+                img = img.filter(ImageFilter.GaussianBlur(radius=args[0]))
+                draw = self._draw(img, (x0, y0))
+            elif isinstance(op, str):
+                getattr(draw, op)(*args, **kwargs)
+            else:
+                op(img, *args, origin=(x0, y0), **kwargs)
+        if (x0, y0, x1, y1) == tuple(box):
+            return img
+        return img.crop((left - x0, top - y0, right - x0, bottom - y0))
+
+    def render(self, bands, box=None):
+        """Replay ``box`` (default: the whole frame) as ``bands`` horizontal bands on as many threads.
+
+        Each band replays only the operations that reach it, as in
+        ``render_box``, and the bands are stitched back into one image.
+        Blurs, pastes and the NumPy layers release the GIL, so they overlap
+        across bands; single draw calls still take turns.
+        """
+        left, top, right, bottom = box or (0, 0, self.width, self.height)
+        rows = -(-(bottom - top) // bands)
+        boxes = [(left, y, right, min(y + rows, bottom)) for y in range(top, bottom, rows)]
+        img = Image.new("RGB", (right - left, bottom - top))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(boxes)) as pool:
+            for (_, y, _, _), band in zip(boxes, pool.map(self.render_box, boxes)):
+                img.paste(band, (0, y - top))
+        return img
+
+    def strips(self, rows, box=None):
+        """Yield ``box`` (default: the whole frame) as strips of ``rows`` rows."""
+        left, top, right, bottom = box or (0, 0, self.width, self.height)
+        for y in range(top, bottom, rows):
+            yield self.render_box((left, y, right, min(y + rows, bottom)))
+
+
+class RecordingDraw:
+    """Draw handle that records calls into a ``DrawList`` with their extents.
+
+    Coordinates are design units like any draw handle's; ``textlength`` is
+    answered at once by a real handle for the same scale.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.scale = canvas.ctx.scale
+        probe = Image.new("RGB", (1, 1))
+        self._probe = GlyphDraw(probe) if self.scale == 1 else ScaledDraw(probe, self.scale)
+
+    def textlength(self, *args, **kwargs):
+        return self._probe.textlength(*args, **kwargs)
+
+    def _record(self, name, args, kwargs, xs, ys, pad, pad_x=None):
+        s = self.scale
+        pad_x = pad if pad_x is None else pad_x
+        self.canvas.record(name, args, kwargs, (min(xs) * s - pad_x, min(ys) * s - pad,
+                                                max(xs) * s + pad_x, max(ys) * s + pad))
+
+    def text(self, xy, text, *args, **kwargs):
+        # Generous: anchors may center or right-align the text on xy, and
+        # lines stack down.
+        font = kwargs["font"] if "font" in kwargs else args[1]
+        lines = text.split("\n")
+        extra = kwargs.get("stroke_width", 0) + 4
+        pad = len(lines) * (2 * font.size + 4) + extra
+        pad_x = (max(len(line) for line in lines) + 1) * font.size + extra
+        self._record("text", (xy, text, *args), kwargs, [xy[0]], [xy[1]], pad, pad_x)
+
+    def line(self, xy, *args, **kwargs):
+        width = kwargs.get("width", args[1] if len(args) > 1 else 1)
+        self._record("line", (xy, *args), kwargs, _xs(xy), _ys(xy), width * self.scale + 2)
+
+    def ellipse(self, xy, *args, **kwargs):
+        self._record("ellipse", (xy, *args), kwargs, _xs(xy), _ys(xy), 2)
+
+    def rectangle(self, xy, *args, **kwargs):
+        self._record("rectangle", (xy, *args), kwargs, _xs(xy), _ys(xy), 2)
+
+    def point(self, xy, *args, **kwargs):
+        self._record("point", (xy, *args), kwargs, _xs(xy), _ys(xy), self.scale + 2)
+
+
+# ─────────────────────────────────────────────────────────────
+# Registry — every wallpaper with its number, slug and seed
+# ─────────────────────────────────────────────────────────────
+BACKGROUNDS = "backgrounds"
+WALLPAPERS = []
+
+
+@dataclass(frozen=True)
+class Wallpaper:
+    """A registered generator and the file it renders to."""
+
+    number: int
+    slug: str
+    seed: int
+    func: Callable
+    options: tuple = ()
+
+    @property
+    def name(self):
+        return self.func.__name__
+
+    @property
+    def filename(self):
+        return f"{self.number}-{self.slug}.png"
+
+    def render(self, size=(W, H), exact=True, trace=None, record=False):
+        """Seed ``random`` and run the generator at ``size``, returning the image.
+
+        With a ``PhaseTrace``, time before the generator's first phase mark
+        is recorded as ``setup``.  With ``record`` the result is a
+        ``DrawList`` to render in strips instead of an image.  ``options``
+        (name, value) pairs are passed to the generator as keywords.
+        """
+        random.seed(self.seed)
+        if trace is not None:
+            trace.mark("setup")
+        ctx = RenderContext(*size, exact=exact, trace=trace, record=record)
+        img = self.func(ctx, **dict(self.options))
+        if trace is not None:
+            trace.mark(None)
+        return img
+
+
+def register(number, slug, seed):
+    """Decorator adding a ``wallpaper_*`` function to ``WALLPAPERS``."""
+    def decorator(func):
+        WALLPAPERS.append(Wallpaper(number, slug, seed, func))
+        return func
+    return decorator
+
+
+def find_wallpaper(slug):
+    for wp in WALLPAPERS:
+        if wp.slug == slug:
+            return wp
+    raise KeyError(slug)
+
+
+def with_options(wallpapers, options):
+    """Give each wallpaper the ``options`` its generator takes as a keyword.
+
+    ``{"nodes": 12000}`` reaches only the circuit board.  A name that none
+    of ``wallpapers`` accepts raises ``ValueError``.
+    """
+    params = {wp.slug: inspect.signature(wp.func).parameters for wp in wallpapers}
+    unknown = [name for name in options if not any(name in p for p in params.values())]
+    if unknown:
+        raise ValueError(f"no selected wallpaper takes {', '.join(unknown)}")
+    return [replace(wp, options=tuple((name, value) for name, value in sorted(options.items())
+                                      if name in params[wp.slug]))
+            for wp in wallpapers]
+
+
+def select(selectors):
+    """Resolve numbers, slugs, function names or globs to wallpapers.
+
+    ``["7", "cross", "*rain"]`` selects the skull, the cross and both rain
+    designs.  The result keeps registry order and contains no duplicates.
+    """
+    if not selectors:
+        return list(WALLPAPERS)
+    chosen = set()
+    for sel in selectors:
+        pattern = sel.replace("_", "-").removeprefix("wallpaper-")
+        matches = [wp for wp in WALLPAPERS
+                   if (sel.isdigit() and wp.number == int(sel))
+                   or fnmatch.fnmatchcase(wp.slug, pattern)]
+        if not matches:
+            raise ValueError(f"no wallpaper matches {sel!r}")
+        chosen.update(wp.number for wp in matches)
+    return [wp for wp in WALLPAPERS if wp.number in chosen]
 
 
 # ─────────────────────────────────────────────────────────────
 # 1. Matrix Rain — classic falling katakana
 # ─────────────────────────────────────────────────────────────
-def wallpaper_matrix_rain():
+def _fade(fade, steps):
+    """``fade`` as is, or snapped to ``steps`` levels for the live renderer."""
+    return fade if steps is None else round(fade * steps) / steps
+
+
+def matrix_rain_tier(i, n, steps=None):
+    """Color and font size of glyph ``i`` (0 = head) of an ``n``-glyph stream."""
+    t = i / n
+    if i == 0:
+        return blend(BG, (180, 255, 200), 0.95), 30
+    if i == 1:
+        return blend(BG, (100, 255, 130), 0.85), 30
+    if t < 0.15:
+        return blend(BG, (0, 255, 65), 0.80), 30
+    if t < 0.35:
+        fade = _fade((t - 0.15) / 0.2, steps)
+        return blend(BG, (0, 220, 55), 0.70 - 0.15 * fade), 24
+    if t < 0.6:
+        fade = _fade((t - 0.35) / 0.25, steps)
+        return blend(BG, (0, 180, 40), 0.50 - 0.15 * fade), 24
+    if t < 0.85:
+        fade = _fade((t - 0.6) / 0.25, steps)
+        return blend(BG, (0, 130, 30), 0.30 - 0.10 * fade), 18
+    fade = _fade((t - 0.85) / 0.15, steps)
+    return blend(BG, (0, 80, 20), 0.15 - 0.06 * fade), 18
+
+
+def matrix_rain_backdrop(ctx, img, draw):
+    """Ghostly katakana scattered behind the streams."""
+    scatter_glyphs(ctx, img, draw, 5000, MATRIX_CHARS, (0, 255, 65), (0.04, 0.10),
+                   ctx.font(18), alpha_first=False)
+
+
+@register(1, "matrix-rain", seed=42)
+def wallpaper_matrix_rain(ctx):
     """Bright neon green Matrix digital rain on deep black."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_lg = get_font(30)
-    font_md = get_font(24)
-    font_sm = get_font(18)
+    fonts = {size: ctx.font(size) for size in (30, 24, 18)}
+    font_md = fonts[24]
 
-    random.seed(42)
     col_width = 34
     char_height = 36
     cols = W // col_width + 1
 
     # Layer 1: Background scatter (ghostly glow)
-    for _ in range(5000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        char = random.choice(MATRIX_CHARS)
-        a = random.uniform(0.04, 0.10)
-        draw.text((x, y), char, fill=blend(BG, (0, 255, 65), a), font=font_sm)
+    ctx.phase("scatter")
+    matrix_rain_backdrop(ctx, img, draw)
 
     # Layer 2: Main dense rain streams
+    ctx.phase("rain")
     for col in range(cols):
         x = col * col_width
         num_streams = random.randint(1, 2)
@@ -72,37 +1318,11 @@ def wallpaper_matrix_rain():
                     continue
 
                 char = random.choice(MATRIX_CHARS)
-                t = i / stream_len
-
-                if i == 0:
-                    color = blend(BG, (180, 255, 200), 0.95)
-                    f = font_lg
-                elif i == 1:
-                    color = blend(BG, (100, 255, 130), 0.85)
-                    f = font_lg
-                elif t < 0.15:
-                    color = blend(BG, (0, 255, 65), 0.80)
-                    f = font_lg
-                elif t < 0.35:
-                    fade = (t - 0.15) / 0.2
-                    color = blend(BG, (0, 220, 55), 0.70 - 0.15 * fade)
-                    f = font_md
-                elif t < 0.6:
-                    fade = (t - 0.35) / 0.25
-                    color = blend(BG, (0, 180, 40), 0.50 - 0.15 * fade)
-                    f = font_md
-                elif t < 0.85:
-                    fade = (t - 0.6) / 0.25
-                    color = blend(BG, (0, 130, 30), 0.30 - 0.10 * fade)
-                    f = font_sm
-                else:
-                    fade = (t - 0.85) / 0.15
-                    color = blend(BG, (0, 80, 20), 0.15 - 0.06 * fade)
-                    f = font_sm
-
-                draw.text((x, y), char, fill=color, font=f)
+                color, size = matrix_rain_tier(i, stream_len)
+                draw.text((x, y), char, fill=color, font=fonts[size])
 
     # Layer 3: Mid-ground streams (offset)
+    ctx.phase("midground rain")
     random.seed(88)
     for col in range(0, cols, 2):
         x = col * col_width + 17
@@ -118,24 +1338,32 @@ def wallpaper_matrix_rain():
             alpha = 0.55 * (1 - t * 0.8)
             draw.text((x, y), char, fill=blend(BG, (0, 200, 50), alpha), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/1-matrix-rain.png", "PNG", optimize=True)
-    print("Saved backgrounds/1-matrix-rain.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 2. Circuit Board — neon traces and glowing nodes
 # ─────────────────────────────────────────────────────────────
-def wallpaper_circuit():
-    """Dense circuit board with neon green traces on dark background."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(77)
+@register(2, "circuit", seed=77)
+def wallpaper_circuit(ctx, nodes=None):
+    """Dense circuit board with neon green traces on dark background.
+
+    ``nodes`` is how many junctions get wired to their neighbors; by default
+    400 per design-size screen, so wide and spanned canvases keep the same
+    density; ``--set nodes=N`` asks for a denser board.  Links are found
+    through a ``GridIndex``, so boards of 10k+ nodes stay cheap.
+    """
+    if nodes is None:
+        nodes = round(400 * ctx.screens)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
     bright = (0, 255, 65)
     med = (0, 200, 50)
     dark = (0, 150, 35)
 
+    ctx.phase("traces")
     for _ in range(120):
         y = random.randint(0, H)
         x1 = random.randint(0, W)
@@ -152,32 +1380,33 @@ def wallpaper_circuit():
         a = random.uniform(0.15, 0.45)
         draw.line([(x, y1), (x, y1 + length)], fill=blend(BG, dark, a), width=w)
 
-    nodes = [(random.randint(0, W), random.randint(0, H)) for _ in range(400)]
+    ctx.phase("links")
+    points = [(random.randint(0, W), random.randint(0, H)) for _ in range(nodes)]
+    # Cells of about four nodes each, so a lookup stays a few buckets at any count.
+    index = GridIndex(points, min(350, max(1, round(math.sqrt(W * H * 4 / max(1, nodes))))))
 
-    for i, (x1, y1) in enumerate(nodes):
-        nearest = sorted(
-            range(len(nodes)),
-            key=lambda j: math.hypot(nodes[j][0] - x1, nodes[j][1] - y1)
-        )[1:random.randint(2, 5)]
+    for x1, y1 in points:
+        # The node itself ranks first; nothing past 350 is ever wired.
+        nearest = index.nearest(x1, y1, random.randint(2, 5), 350)[1:]
 
         for j in nearest:
-            x2, y2 = nodes[j]
+            x2, y2 = points[j]
             dist = math.hypot(x2 - x1, y2 - y1)
-            if dist > 350:
-                continue
             a = 0.20 + 0.25 * (1 - dist / 350)
             color = blend(BG, dark, a)
             w = 2 if a > 0.30 else 1
             mid_x = x1 if random.random() < 0.5 else x2
             draw.line([(x1, y1), (mid_x, y2), (x2, y2)], fill=color, width=w)
 
-    for x, y in nodes:
+    ctx.phase("nodes")
+    for x, y in points:
         size = random.randint(4, 10)
         a = random.uniform(0.40, 0.85)
         draw.ellipse([x - size, y - size, x + size, y + size], fill=blend(BG, med, a))
         if size > 5:
             draw.ellipse([x - 2, y - 2, x + 2, y + 2], fill=blend(BG, bright, a * 0.9))
 
+    ctx.phase("chips")
     for _ in range(70):
         x = random.randint(50, W - 100)
         y = random.randint(50, H - 60)
@@ -193,6 +1422,7 @@ def wallpaper_circuit():
             draw.line([(px, y - 6), (px, y)], fill=pin_color, width=2)
             draw.line([(px, y + h), (px, y + h + 6)], fill=pin_color, width=2)
 
+    ctx.phase("rings")
     for _ in range(20):
         cx = random.randint(100, W - 100)
         cy = random.randint(100, H - 100)
@@ -204,23 +1434,22 @@ def wallpaper_circuit():
                              outline=blend(BG, med, a), width=2)
         draw.ellipse([cx - 4, cy - 4, cx + 4, cy + 4], fill=blend(BG, bright, 0.5))
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/2-circuit.png", "PNG", optimize=True)
-    print("Saved backgrounds/2-circuit.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 3. Hex Dump — forensic memory dump
 # ─────────────────────────────────────────────────────────────
-def wallpaper_hexdump():
+@register(3, "hexdump", seed=55)
+def wallpaper_hexdump(ctx):
     """Full-screen hex dump with neon green text on black like a forensic tool."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font = get_font(26)
-    font_sm = get_font(22)
+    font = ctx.font(26)
+    font_sm = ctx.font(22)
 
-    random.seed(55)
     line_h = 32
     cw = 15
     rows = H // line_h + 1
@@ -232,6 +1461,7 @@ def wallpaper_hexdump():
     hex_end = hex_start + bytes_per_line * 3 * cw
     ascii_start = hex_end + 2 * cw
 
+    ctx.phase("header")
     sep = blend(BG, (0, 255, 65), 0.12)
     draw.line([(addr_end, 0), (addr_end, H)], fill=sep, width=1)
     draw.line([(ascii_start - cw, 0), (ascii_start - cw, H)], fill=sep, width=1)
@@ -243,6 +1473,7 @@ def wallpaper_hexdump():
     draw.text((ascii_start, 4), "DECODED ASCII", fill=hdr_color, font=font_sm)
     draw.line([(margin, 32), (W - margin, 32)], fill=blend(BG, (0, 255, 65), 0.25), width=2)
 
+    ctx.phase("rows")
     hot_zones = [
         (0.08, 0.22, 0.85),
         (0.30, 0.48, 1.0),
@@ -293,41 +1524,61 @@ def wallpaper_hexdump():
             char = chr(random.randint(33, 126)) if random.random() > 0.3 else random.choice("._-:;|")
             draw.text((ax, y), char, fill=blend(BG, (0, 200, 50), base_alpha * 0.50), font=font_sm)
 
-    for z_start, z_end, _ in hot_zones:
-        mid_y = int(((z_start + z_end) / 2) * H)
-        for dy in range(-6, 7):
-            la = 0.06 * (1 - abs(dy) / 7)
-            draw.line([(0, mid_y + dy), (W, mid_y + dy)], fill=blend(BG, (0, 255, 65), la))
+    def hot_bands(y):
+        a = np.zeros_like(y)
+        for z_start, z_end, _ in hot_zones:
+            dy = np.abs(y - int(((z_start + z_end) / 2) * H))
+            a = np.maximum(a, np.where(dy < 7, 0.06 * (1 - dy / 7), 0))
+        return a
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.2))
-    img.save("backgrounds/3-hexdump.png", "PNG", optimize=True)
-    print("Saved backgrounds/3-hexdump.png")
+    ctx.gradient(img, hot_bands, (0, 255, 65))
+
+    img = ctx.blur(img, 0.2)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 4. Binary Rain — classic 0s and 1s cascade
 # ─────────────────────────────────────────────────────────────
-def wallpaper_binary_rain():
+def binary_rain_tier(i, n, steps=None):
+    """Color and font size of digit ``i`` (0 = head) of an ``n``-digit stream."""
+    t = i / n
+    if i < 2:
+        # Head: bright white-green
+        return blend(BG, (200, 255, 220), 0.92 - i * 0.08), 36
+    if t < 0.2:
+        return blend(BG, (0, 255, 65), 0.78), 24
+    if t < 0.5:
+        fade = _fade((t - 0.2) / 0.3, steps)
+        return blend(BG, (0, 200, 45), 0.60 - 0.20 * fade), 24
+    if t < 0.8:
+        fade = _fade((t - 0.5) / 0.3, steps)
+        return blend(BG, (0, 150, 35), 0.35 - 0.15 * fade), 16
+    fade = _fade((t - 0.8) / 0.2, steps)
+    return blend(BG, (0, 100, 25), 0.15 - 0.07 * fade), 16
+
+
+def binary_rain_backdrop(ctx, img, draw):
+    """Tiny binary noise behind the columns."""
+    scatter_glyphs(ctx, img, draw, 12000, "01", (0, 255, 65), (0.03, 0.08), ctx.font(12),
+                   alpha_first=False)
+
+
+@register(4, "binary-rain", seed=101)
+def wallpaper_binary_rain(ctx):
     """Cascading binary digits (0s and 1s) in varying sizes and intensities."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-
-    font_lg = get_font(36)
-    font_md = get_font(24)
-    font_sm = get_font(16)
-    font_xs = get_font(12)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    random.seed(101)
+    fonts = {size: ctx.font(size) for size in (36, 24, 16)}
+    font_lg = fonts[36]
 
     # Layer 1: Tiny background binary noise
-    for _ in range(12000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        char = random.choice("01")
-        a = random.uniform(0.03, 0.08)
-        draw.text((x, y), char, fill=blend(BG, (0, 255, 65), a), font=font_xs)
+    ctx.phase("scatter")
+    binary_rain_backdrop(ctx, img, draw)
 
     # Layer 2: Dense columns of binary
+    ctx.phase("columns")
     col_width = 22
     cols = W // col_width + 1
     for col in range(cols):
@@ -345,31 +1596,11 @@ def wallpaper_binary_rain():
                     continue
 
                 char = random.choice("01")
-                t = i / stream_len
-
-                if i < 2:
-                    # Head: bright white-green
-                    color = blend(BG, (200, 255, 220), 0.92 - i * 0.08)
-                    f = font_lg
-                elif t < 0.2:
-                    color = blend(BG, (0, 255, 65), 0.78)
-                    f = font_md
-                elif t < 0.5:
-                    fade = (t - 0.2) / 0.3
-                    color = blend(BG, (0, 200, 45), 0.60 - 0.20 * fade)
-                    f = font_md
-                elif t < 0.8:
-                    fade = (t - 0.5) / 0.3
-                    color = blend(BG, (0, 150, 35), 0.35 - 0.15 * fade)
-                    f = font_sm
-                else:
-                    fade = (t - 0.8) / 0.2
-                    color = blend(BG, (0, 100, 25), 0.15 - 0.07 * fade)
-                    f = font_sm
-
-                draw.text((x, y), char, fill=color, font=f)
+                color, size = binary_rain_tier(i, stream_len)
+                draw.text((x, y), char, fill=color, font=fonts[size])
 
     # Layer 3: Scattered large binary for depth
+    ctx.phase("depth")
     for _ in range(200):
         x = random.randint(0, W)
         y = random.randint(0, H)
@@ -377,33 +1608,31 @@ def wallpaper_binary_rain():
         a = random.uniform(0.15, 0.40)
         draw.text((x, y), char, fill=blend(BG, (0, 255, 65), a), font=font_lg)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/4-binary-rain.png", "PNG", optimize=True)
-    print("Saved backgrounds/4-binary-rain.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 5. Cyber Grid — 3D perspective grid with data points
 # ─────────────────────────────────────────────────────────────
-def wallpaper_cyber_grid():
+@register(5, "cyber-grid", seed=202)
+def wallpaper_cyber_grid(ctx):
     """Retro 3D perspective grid like a cyber landscape with data pulses."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    font_sm = get_font(14)
-    random.seed(202)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
+    font_sm = ctx.font(14)
 
     cx, cy = W // 2, H // 2 + 200  # vanishing point below center
     green = (0, 255, 65)
     dark_green = (0, 150, 35)
 
     # Horizon glow
-    for dy in range(-300, 300):
-        y = cy + dy
-        if 0 <= y < H:
-            a = 0.08 * (1 - abs(dy) / 300) ** 2
-            draw.line([(0, y), (W, y)], fill=blend(BG, green, a), width=1)
+    ctx.phase("horizon")
+    ctx.gradient(img, lambda y: np.where((y >= cy - 300) & (y < cy + 300),
+                                         0.08 * (1 - np.abs(y - cy) / 300) ** 2, 0), green)
 
     # Perspective horizontal lines (ground plane)
+    ctx.phase("grid")
     for i in range(1, 80):
         t = i / 80
         # Exponential spacing for perspective
@@ -443,6 +1672,7 @@ def wallpaper_cyber_grid():
         draw.line([(tx, cy), (bx, -50)], fill=blend(BG, dark_green, a), width=1)
 
     # Data points at grid intersections (ground plane)
+    ctx.phase("data points")
     for _ in range(300):
         t = random.uniform(0.05, 0.95)
         spread = random.uniform(-0.9, 0.9)
@@ -475,27 +1705,27 @@ def wallpaper_cyber_grid():
                           fill=blend(BG, green, a * 0.5), font=font_sm)
 
     # Central bright "sun" / data beacon
+    ctx.phase("beacon")
     for r in range(200, 0, -2):
         a = 0.12 * (1 - r / 200) ** 2
         draw.ellipse([cx - r, cy - r, cx + r, cy + r],
                      fill=blend(BG, green, a))
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/5-cyber-grid.png", "PNG", optimize=True)
-    print("Saved backgrounds/5-cyber-grid.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 6. Terminal Scroll — hacker output flooding the screen
 # ─────────────────────────────────────────────────────────────
-def wallpaper_terminal_scroll():
+@register(6, "terminal-scroll", seed=303)
+def wallpaper_terminal_scroll(ctx):
     """Screen full of scrolling terminal output like a hacking session."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font = get_font(18)
-    font_sm = get_font(14)
-    random.seed(303)
+    font = ctx.font(18)
+    font_sm = ctx.font(14)
 
     green = (0, 255, 65)
     dim_green = (0, 150, 35)
@@ -509,6 +1739,7 @@ def wallpaper_terminal_scroll():
     margin = 30
 
     # Line templates — realistic hacking output
+    ctx.phase("log lines")
     templates = [
         ("dim", "[{time}] Scanning port {port}/tcp..."),
         ("green", "[{time}] PORT {port}/tcp OPEN — {service}"),
@@ -585,33 +1816,31 @@ def wallpaper_terminal_scroll():
         indent = random.choice([0, 0, 0, 20, 20, 40])
         draw.text((margin + indent, y), text, fill=color, font=font)
 
-    # Scanline effect — horizontal lines every 2px
-    for y in range(0, H, 4):
-        draw.line([(0, y), (W, y)], fill=blend(BG, (0, 0, 0), 0.15), width=1)
+    # Scanline effect — every 4th row dimmed, text included
+    ctx.phase("scanlines")
+    ctx.gradient(img, lambda y: np.where(y % 4 < 1, 0.15, 0), (0, 0, 0), mode="multiply")
 
     # Bright focus band in center
-    for dy in range(-80, 80):
-        y = H // 2 + dy
-        a = 0.04 * (1 - abs(dy) / 80) ** 2
-        draw.line([(0, y), (W, y)], fill=blend(BG, green, a), width=1)
+    ctx.phase("focus band")
+    ctx.gradient(img, lambda y: np.where((y >= H // 2 - 80) & (y < H // 2 + 80),
+                                         0.04 * (1 - np.abs(y - H // 2) / 80) ** 2, 0), green)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.2))
-    img.save("backgrounds/6-terminal-scroll.png", "PNG", optimize=True)
-    print("Saved backgrounds/6-terminal-scroll.png")
+    img = ctx.blur(img, 0.2)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 7. Skull ASCII — hacker skull made of characters
 # ─────────────────────────────────────────────────────────────
-def wallpaper_skull():
+@register(7, "skull", seed=404)
+def wallpaper_skull(ctx):
     """A hacker skull composed of ASCII/Matrix characters on dark background."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(404)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_sm = get_font(14)
-    font_md = get_font(20)
-    font_bg = get_font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(20)
+    font_bg = ctx.font(10)
 
     green = (0, 255, 65)
     bright = (180, 255, 200)
@@ -620,14 +1849,12 @@ def wallpaper_skull():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(8000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.06)
-        draw.text((x, y), random.choice(chars), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 8000, chars, green, (0.02, 0.06), font_bg)
 
     # Skull shape using parametric math
     # We'll fill the skull shape with dense characters
+    ctx.phase("fill")
     def in_skull(px, py):
         """Check if point is inside a skull shape centered at (cx, cy)."""
         # Normalize coordinates
@@ -636,28 +1863,20 @@ def wallpaper_skull():
 
         # Main cranium (top oval)
         cranium = (nx ** 2) / 1.0 + ((ny + 0.25) ** 2) / 0.85
-        if cranium < 1 and ny < 0.35:
-            # Left eye socket
-            ex_l = ((nx + 0.35) ** 2) / 0.045 + ((ny + 0.05) ** 2) / 0.06
-            if ex_l < 1:
-                return False
-            # Right eye socket
-            ex_r = ((nx - 0.35) ** 2) / 0.045 + ((ny + 0.05) ** 2) / 0.06
-            if ex_r < 1:
-                return False
-            # Nose triangle
-            if abs(nx) < 0.12 and 0.1 < ny < 0.3 and abs(nx) < 0.12 * (1 - (ny - 0.1) / 0.2):
-                return False
-            return True
+        # Left and right eye sockets
+        ex_l = ((nx + 0.35) ** 2) / 0.045 + ((ny + 0.05) ** 2) / 0.06
+        ex_r = ((nx - 0.35) ** 2) / 0.045 + ((ny + 0.05) ** 2) / 0.06
+        # Nose triangle
+        nose = ((abs(nx) < 0.12) & (0.1 < ny) & (ny < 0.3)
+                & (abs(nx) < 0.12 * (1 - (ny - 0.1) / 0.2)))
+        in_cranium = (cranium < 1) & (ny < 0.35)
+        cranium_fill = ~((ex_l < 1) | (ex_r < 1) | nose)
 
-        # Jaw (narrower rectangle below)
-        if abs(nx) < 0.65 * (1 - max(0, (ny - 0.35)) * 1.2) and 0.3 < ny < 0.75:
-            # Teeth gaps
-            if 0.42 < ny < 0.55 and int((nx + 0.6) * 8) % 2 == 0:
-                return False
-            return True
+        # Jaw (narrower rectangle below), with teeth gaps
+        jaw = (abs(nx) < 0.65 * (1 - np.maximum(0, ny - 0.35) * 1.2)) & (0.3 < ny) & (ny < 0.75)
+        teeth = (0.42 < ny) & (ny < 0.55) & (np.trunc((nx + 0.6) * 8) % 2 == 0)
 
-        return False
+        return np.where(in_cranium, cranium_fill, jaw & ~teeth)
 
     def skull_edge_dist(px, py):
         """Approximate distance to the skull edge for glow effects."""
@@ -668,21 +1887,20 @@ def wallpaper_skull():
 
     # Fill skull with characters
     step = 14
-    for y in range(cy - 520, cy + 420, step):
-        for x in range(cx - 450, cx + 450, step):
-            if in_skull(x, y):
-                char = random.choice(chars)
-                # Brighter near edges
-                edge_d = skull_edge_dist(x, y)
-                if edge_d < 0.15:
-                    a = random.uniform(0.65, 0.90)
-                    c = bright
-                else:
-                    a = random.uniform(0.30, 0.60)
-                    c = green
-                draw.text((x, y), char, fill=blend(BG, c, a), font=font_md)
+    grid = ShapeGrid(range(cx - 450, cx + 450, step), range(cy - 520, cy + 420, step))
+    for x, y, edge_d in grid.cells(grid.eval(in_skull), grid.eval(skull_edge_dist)):
+        char = random.choice(chars)
+        # Brighter near edges
+        if edge_d < 0.15:
+            a = random.uniform(0.65, 0.90)
+            c = bright
+        else:
+            a = random.uniform(0.30, 0.60)
+            c = green
+        draw.text((x, y), char, fill=blend(BG, c, a), font=font_md)
 
     # Eye glow — fill eye sockets with bright dots
+    ctx.phase("eyes")
     for eye_cx in [cx - 140, cx + 140]:
         eye_cy = cy - 25
         for _ in range(600):
@@ -696,30 +1914,26 @@ def wallpaper_skull():
                           fill=blend(BG, bright, a), font=font_sm)
 
     # Radial glow around skull
-    for r in range(600, 0, -3):
-        a = 0.025 * (1 - r / 600) ** 2
-        if a > 0.002:
-            draw.ellipse([cx - r, cy - r, cx + r, cy + r],
-                         outline=blend(BG, green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy), 600, green, 0.025)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/7-skull.png", "PNG", optimize=True)
-    print("Saved backgrounds/7-skull.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 8. Glowing Cross — monumental cross made of Matrix characters
 # ─────────────────────────────────────────────────────────────
-def wallpaper_cross():
+@register(8, "cross", seed=777)
+def wallpaper_cross(ctx):
     """A towering glowing cross made of cascading Matrix characters."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(777)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(16)
-    font_md = get_font(22)
-    font_lg = get_font(30)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(16)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -728,13 +1942,11 @@ def wallpaper_cross():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(8000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.06)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 8000, MATRIX_CHARS, green, (0.02, 0.06), font_bg)
 
     # Cross dimensions
+    ctx.phase("fill")
     cross_h = 1400   # total height
     cross_w = 800    # crossbeam width
     beam_thick = 140  # thickness of beams
@@ -743,56 +1955,54 @@ def wallpaper_cross():
     def in_cross(px, py):
         """Check if point is inside the cross shape."""
         # Vertical beam
-        if abs(px - cx) < beam_thick // 2:
-            if cy - cross_h // 2 < py < cy + cross_h // 2:
-                return True
+        vertical = (abs(px - cx) < beam_thick // 2) & (cy - cross_h // 2 < py) & (py < cy + cross_h // 2)
         # Horizontal crossbeam
-        if abs(py - crossbeam_y) < beam_thick // 2:
-            if abs(px - cx) < cross_w // 2:
-                return True
-        return False
+        horizontal = (abs(py - crossbeam_y) < beam_thick // 2) & (abs(px - cx) < cross_w // 2)
+        return vertical | horizontal
 
     def cross_dist(px, py):
         """Distance to nearest cross edge for glow."""
-        dists = []
-        # Vertical beam edges
-        if cy - cross_h // 2 < py < cy + cross_h // 2:
-            dists.append(abs(abs(px - cx) - beam_thick // 2))
-        # Horizontal beam edges
-        if abs(px - cx) < cross_w // 2:
-            dists.append(abs(abs(py - crossbeam_y) - beam_thick // 2))
-        # Ends
-        if abs(px - cx) < beam_thick // 2:
-            dists.append(abs(py - (cy - cross_h // 2)))
-            dists.append(abs(py - (cy + cross_h // 2)))
-        if abs(py - crossbeam_y) < beam_thick // 2:
-            dists.append(abs(px - (cx - cross_w // 2)))
-            dists.append(abs(px - (cx + cross_w // 2)))
-        return min(dists) if dists else 999
+        in_vertical = abs(px - cx) < beam_thick // 2
+        in_horizontal = abs(py - crossbeam_y) < beam_thick // 2
+        candidates = [
+            # Vertical beam edges
+            (cy - cross_h // 2 < py) & (py < cy + cross_h // 2), abs(abs(px - cx) - beam_thick // 2),
+            # Horizontal beam edges
+            abs(px - cx) < cross_w // 2, abs(abs(py - crossbeam_y) - beam_thick // 2),
+            # Ends
+            in_vertical, abs(py - (cy - cross_h // 2)),
+            in_vertical, abs(py - (cy + cross_h // 2)),
+            in_horizontal, abs(px - (cx - cross_w // 2)),
+            in_horizontal, abs(px - (cx + cross_w // 2)),
+        ]
+        dist = np.inf
+        for applies, d in zip(candidates[::2], candidates[1::2]):
+            dist = np.where(applies, np.minimum(dist, d), dist)
+        return np.where(np.isinf(dist), 999, dist)
 
     # Fill cross with dense characters
     step = 16
-    for y in range(cy - cross_h // 2 - 10, cy + cross_h // 2 + 10, step):
-        for x in range(cx - cross_w // 2 - 10, cx + cross_w // 2 + 10, step):
-            if in_cross(x, y):
-                char = random.choice(chars)
-                # Edge glow
-                ed = cross_dist(x, y)
-                if ed < 20:
-                    a = random.uniform(0.75, 0.95)
-                    c = bright
-                    f = font_lg
-                elif ed < 40:
-                    a = random.uniform(0.55, 0.75)
-                    c = green
-                    f = font_md
-                else:
-                    a = random.uniform(0.30, 0.55)
-                    c = green
-                    f = font_sm
-                draw.text((x, y), char, fill=blend(BG, c, a), font=f)
+    grid = ShapeGrid(range(cx - cross_w // 2 - 10, cx + cross_w // 2 + 10, step),
+                     range(cy - cross_h // 2 - 10, cy + cross_h // 2 + 10, step))
+    for x, y, ed in grid.cells(grid.eval(in_cross), grid.eval(cross_dist)):
+        char = random.choice(chars)
+        # Edge glow
+        if ed < 20:
+            a = random.uniform(0.75, 0.95)
+            c = bright
+            f = font_lg
+        elif ed < 40:
+            a = random.uniform(0.55, 0.75)
+            c = green
+            f = font_md
+        else:
+            a = random.uniform(0.30, 0.55)
+            c = green
+            f = font_sm
+        draw.text((x, y), char, fill=blend(BG, c, a), font=f)
 
     # Matrix rain falling through the cross
+    ctx.phase("rain")
     for col in range(cx - cross_w // 2, cx + cross_w // 2, 34):
         stream_len = random.randint(8, 25)
         start_y = random.randint(cy - cross_h // 2, cy + 200)
@@ -809,41 +2019,31 @@ def wallpaper_cross():
             draw.text((x, y), random.choice(MATRIX_CHARS), fill=color, font=font_md)
 
     # Radiant glow behind cross
-    for r in range(800, 0, -4):
-        a = 0.03 * (1 - r / 800) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - 100 - r, cx + r, cy - 100 + r],
-                         outline=blend(BG, green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy - 100), 800, green, 0.03)
 
     # Light rays emanating from cross center
-    for angle_deg in range(0, 360, 15):
-        angle = math.radians(angle_deg)
-        for r in range(50, 700, 3):
-            x = cx + int(r * math.cos(angle))
-            y = crossbeam_y + int(r * math.sin(angle))
-            if 0 <= x < W and 0 <= y < H:
-                a = 0.06 * (1 - r / 700) ** 1.5
-                if a > 0.003:
-                    draw.point((x, y), fill=blend(BG, green, a))
+    ctx.phase("rays")
+    ctx.rays(img, (cx, crossbeam_y), range(0, 360, 15), (50, 700, 3), green, 0.06, 1.5,
+             floor=0.003)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/8-cross.png", "PNG", optimize=True)
-    print("Saved backgrounds/8-cross.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 9. Jesus Silhouette — Christ figure with outstretched arms
 # ─────────────────────────────────────────────────────────────
-def wallpaper_jesus():
+@register(9, "jesus", seed=333)
+def wallpaper_jesus(ctx):
     """Silhouette of Jesus with outstretched arms, composed of Matrix code."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(333)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(20)
-    font_lg = get_font(28)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(20)
+    font_lg = ctx.font(28)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -853,11 +2053,8 @@ def wallpaper_jesus():
     cx, cy = W // 2, H // 2 + 50
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     def in_figure(px, py):
         """Jesus silhouette: head + body + outstretched arms + robe."""
@@ -866,91 +2063,72 @@ def wallpaper_jesus():
 
         # Head (circle)
         head_cy = -0.75
-        if nx ** 2 + (ny - head_cy) ** 2 < 0.025:
-            return True
+        head_dist = nx ** 2 + (ny - head_cy) ** 2
+        inside = head_dist < 0.025
 
         # Halo (ring around head, slightly larger)
-        head_dist = nx ** 2 + (ny - head_cy) ** 2
-        if 0.03 < head_dist < 0.05:
-            return True
+        inside |= (0.03 < head_dist) & (head_dist < 0.05)
 
         # Neck
-        if abs(nx) < 0.04 and -0.62 < ny < -0.55:
-            return True
+        inside |= (abs(nx) < 0.04) & (-0.62 < ny) & (ny < -0.55)
 
         # Torso (tapers slightly)
-        if -0.55 < ny < 0.1:
-            torso_w = 0.12 + 0.03 * ((ny + 0.55) / 0.65)
-            if abs(nx) < torso_w:
-                return True
+        torso_w = 0.12 + 0.03 * ((ny + 0.55) / 0.65)
+        inside |= (-0.55 < ny) & (ny < 0.1) & (abs(nx) < torso_w)
 
         # Arms outstretched (slight downward angle)
         arm_y_center = -0.40
         arm_droop = 0.15  # how much arms droop at edges
-        if 0.12 < abs(nx) < 0.85:
-            arm_y = arm_y_center + arm_droop * ((abs(nx) - 0.12) / 0.73) ** 1.3
-            if abs(ny - arm_y) < 0.04:
-                return True
+        arm_y = arm_y_center + arm_droop * ((abs(nx) - 0.12) / 0.73) ** 1.3
+        inside |= (0.12 < abs(nx)) & (abs(nx) < 0.85) & (abs(ny - arm_y) < 0.04)
 
         # Hands (slightly wider at arm ends)
         for sign in [-1, 1]:
             hand_cx = sign * 0.85
             hand_cy = arm_y_center + arm_droop
-            if (nx - hand_cx) ** 2 + (ny - hand_cy) ** 2 < 0.003:
-                return True
+            inside |= (nx - hand_cx) ** 2 + (ny - hand_cy) ** 2 < 0.003
 
         # Robe (flowing down, wider at bottom)
-        if 0.1 < ny < 0.85:
-            robe_t = (ny - 0.1) / 0.75
-            robe_w = 0.12 + 0.25 * robe_t ** 0.7
-            if abs(nx) < robe_w:
-                return True
+        robe_t = (ny - 0.1) / 0.75
+        robe_w = 0.12 + 0.25 * robe_t ** 0.7
+        inside |= (0.1 < ny) & (ny < 0.85) & (abs(nx) < robe_w)
 
-        return False
+        return inside
 
     # Fill figure with characters
+    ctx.phase("fill")
     step = 14
-    for y in range(cy - 550, cy + 550, step):
-        for x in range(cx - 500, cx + 500, step):
-            if in_figure(x, y):
-                char = random.choice(chars)
-                # Brightness based on proximity to center
-                dist = math.sqrt((x - cx) ** 2 + (y - cy + 100) ** 2) / 500
-                if dist < 0.2:
-                    a = random.uniform(0.70, 0.90)
-                    c = bright
-                    f = font_lg
-                elif dist < 0.5:
-                    a = random.uniform(0.45, 0.65)
-                    c = green
-                    f = font_md
-                else:
-                    a = random.uniform(0.25, 0.45)
-                    c = green
-                    f = font_sm
+    grid = ShapeGrid(range(cx - 500, cx + 500, step), range(cy - 550, cy + 550, step))
+    for x, y in grid.cells(grid.eval(in_figure)):
+        char = random.choice(chars)
+        # Brightness based on proximity to center
+        dist = math.sqrt((x - cx) ** 2 + (y - cy + 100) ** 2) / 500
+        if dist < 0.2:
+            a = random.uniform(0.70, 0.90)
+            c = bright
+            f = font_lg
+        elif dist < 0.5:
+            a = random.uniform(0.45, 0.65)
+            c = green
+            f = font_md
+        else:
+            a = random.uniform(0.25, 0.45)
+            c = green
+            f = font_sm
 
-                draw.text((x, y), char, fill=blend(BG, c, a), font=f)
+        draw.text((x, y), char, fill=blend(BG, c, a), font=f)
 
     # Halo glow behind head
+    ctx.phase("halo")
     halo_cy = cy - 450
-    for r in range(200, 0, -2):
-        a = 0.06 * (1 - r / 200) ** 1.5
-        if a > 0.002:
-            draw.ellipse([cx - r, halo_cy - r, cx + r, halo_cy + r],
-                         outline=blend(BG, gold, a))
+    ctx.glow(img, (cx, halo_cy), 200, gold, 0.06, power=1.5)
 
     # Light radiating from figure
-    for angle_deg in range(0, 360, 8):
-        angle = math.radians(angle_deg)
-        for r in range(100, 900, 3):
-            x = cx + int(r * math.cos(angle))
-            y = halo_cy + int(r * math.sin(angle))
-            if 0 <= x < W and 0 <= y < H:
-                a = 0.04 * (1 - r / 900) ** 2
-                if a > 0.002:
-                    draw.point((x, y), fill=blend(BG, gold, a))
+    ctx.phase("rays")
+    ctx.rays(img, (cx, halo_cy), range(0, 360, 8), (100, 900, 3), gold, 0.04, 2, floor=0.002)
 
     # Matrix rain flowing around the figure
+    ctx.phase("rain")
     for col in range(0, W, 40):
         if abs(col - cx) < 250:
             continue  # skip over the figure
@@ -964,24 +2142,23 @@ def wallpaper_jesus():
             color = blend(BG, green, max(0.05, 0.30 * (1 - t)))
             draw.text((col, y), random.choice(MATRIX_CHARS), fill=color, font=font_sm)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/9-jesus.png", "PNG", optimize=True)
-    print("Saved backgrounds/9-jesus.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 10. Crown of Thorns — circular crown with Matrix code
 # ─────────────────────────────────────────────────────────────
-def wallpaper_crown_of_thorns():
+@register(10, "crown-of-thorns", seed=430)
+def wallpaper_crown_of_thorns(ctx):
     """Crown of thorns ring made of Matrix code with thorny protrusions."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(430)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(20)
-    font_lg = get_font(26)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(20)
+    font_lg = ctx.font(26)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -991,13 +2168,11 @@ def wallpaper_crown_of_thorns():
     cx, cy = W // 2, H // 2
 
     # Background subtle rain
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     # Crown parameters
+    ctx.phase("thorns")
     outer_r = 450
     inner_r = 350
     crown_thickness = outer_r - inner_r
@@ -1032,6 +2207,7 @@ def wallpaper_crown_of_thorns():
         return None
 
     # Fill crown with characters
+    ctx.phase("fill")
     step = 14
     for y in range(cy - 500, cy + 500, step):
         for x in range(cx - 650, cx + 650, step):
@@ -1062,6 +2238,7 @@ def wallpaper_crown_of_thorns():
                 draw.text((x, y), char, fill=blend(BG, c, a), font=f)
 
     # Intertwined braids — sinusoidal paths around the ring
+    ctx.phase("braids")
     for braid in range(3):
         phase = braid * 2 * math.pi / 3
         for t in range(0, 3600, 2):
@@ -1076,30 +2253,26 @@ def wallpaper_crown_of_thorns():
                           fill=blend(BG, bright, max(0.2, a * 0.6)), font=font_sm)
 
     # Central glow
-    for r in range(350, 0, -3):
-        a = 0.02 * (1 - r / 350) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - r, cx + r, cy + r],
-                         outline=blend(BG, green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy), 350, green, 0.02)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/10-crown-of-thorns.png", "PNG", optimize=True)
-    print("Saved backgrounds/10-crown-of-thorns.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 11. Ichthys (Fish) — Christian fish symbol with data streams
 # ─────────────────────────────────────────────────────────────
-def wallpaper_ichthys():
+@register(11, "ichthys", seed=153)  # John 21:11 — the miraculous catch
+def wallpaper_ichthys(ctx):
     """Christian fish (Ichthys) symbol composed of streaming Matrix code."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(153)  # John 21:11 — the miraculous catch
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(20)
-    font_lg = get_font(28)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(20)
+    font_lg = ctx.font(28)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1108,13 +2281,11 @@ def wallpaper_ichthys():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     # Fish shape using parametric arcs
+    ctx.phase("fill")
     fish_scale = 500
     fish_tail_x = cx - 550  # leftmost point (tail)
     fish_mouth_x = cx + 550  # rightmost point (mouth meets)
@@ -1130,62 +2301,53 @@ def wallpaper_ichthys():
 
         # Simplified: elliptical arcs
         # Upper body line
-        if -1.1 <= nx <= 1.1:
-            # Fish body height varies: max at center, zero at both ends
-            t = (nx + 1.1) / 2.2  # 0 at tail, 1 at mouth
-            # Asymmetric: fatter toward front
-            body_h = 0.45 * math.sin(t * math.pi) ** 0.7
-            if abs(ny) < body_h:
-                return True
-
-            # Outline (thick border)
-            if abs(abs(ny) - body_h) < 0.04:
-                return True
+        # Fish body height varies: max at center, zero at both ends
+        t = (nx + 1.1) / 2.2  # 0 at tail, 1 at mouth
+        # Asymmetric: fatter toward front
+        body_h = 0.45 * np.sin(t * math.pi) ** 0.7
+        # Body, plus the outline (thick border)
+        body = (abs(ny) < body_h) | (abs(abs(ny) - body_h) < 0.04)
+        inside = (-1.1 <= nx) & (nx <= 1.1) & body
 
         # Tail: V-shape extending left from the body
-        if -1.6 <= nx <= -1.0:
-            tail_t = (nx + 1.6) / 0.6  # 0 at far left, 1 at body junction
-            tail_spread = 0.35 * (1 - tail_t)
-            # Two lines of the tail
-            for tail_dir in [-1, 1]:
-                target_y = tail_dir * tail_spread
-                if abs(ny - target_y) < 0.035:
-                    return True
+        tail_t = (nx + 1.6) / 0.6  # 0 at far left, 1 at body junction
+        tail_spread = 0.35 * (1 - tail_t)
+        # Two lines of the tail
+        for tail_dir in [-1, 1]:
+            target_y = tail_dir * tail_spread
+            inside |= (-1.6 <= nx) & (nx <= -1.0) & (abs(ny - target_y) < 0.035)
 
-        return False
+        return inside
 
     def fish_outline_dist(px, py):
         """Distance to nearest fish outline."""
         nx = (px - cx) / fish_scale
         ny = (py - cy) / fish_scale
-        if -1.1 <= nx <= 1.1:
-            t = (nx + 1.1) / 2.2
-            body_h = 0.45 * math.sin(t * math.pi) ** 0.7
-            return abs(abs(ny) - body_h) * fish_scale
-        return 999
+        t = (nx + 1.1) / 2.2
+        body_h = 0.45 * np.sin(t * math.pi) ** 0.7
+        return np.where((-1.1 <= nx) & (nx <= 1.1), abs(abs(ny) - body_h) * fish_scale, 999)
 
     # Fill fish with characters
     step = 14
-    for y in range(cy - 350, cy + 350, step):
-        for x in range(cx - 850, cx + 650, step):
-            if in_fish(x, y):
-                char = random.choice(chars)
-                od = fish_outline_dist(x, y)
-                if od < 25:
-                    a = random.uniform(0.70, 0.92)
-                    c = bright
-                    f = font_lg
-                elif od < 60:
-                    a = random.uniform(0.45, 0.65)
-                    c = green
-                    f = font_md
-                else:
-                    a = random.uniform(0.25, 0.45)
-                    c = green
-                    f = font_sm
-                draw.text((x, y), char, fill=blend(BG, c, a), font=f)
+    grid = ShapeGrid(range(cx - 850, cx + 650, step), range(cy - 350, cy + 350, step))
+    for x, y, od in grid.cells(grid.eval(in_fish), grid.eval(fish_outline_dist)):
+        char = random.choice(chars)
+        if od < 25:
+            a = random.uniform(0.70, 0.92)
+            c = bright
+            f = font_lg
+        elif od < 60:
+            a = random.uniform(0.45, 0.65)
+            c = green
+            f = font_md
+        else:
+            a = random.uniform(0.25, 0.45)
+            c = green
+            f = font_sm
+        draw.text((x, y), char, fill=blend(BG, c, a), font=f)
 
     # Eye
+    ctx.phase("eye")
     eye_x = cx + 320
     eye_y = cy - 40
     for r in range(40, 0, -2):
@@ -1194,12 +2356,14 @@ def wallpaper_ichthys():
                      fill=blend(BG, bright, a))
 
     # "IXΘYΣ" text inside the fish body
-    ichthys_font = get_font(50)
+    ctx.phase("text")
+    ichthys_font = ctx.font(50)
     text = "ΙΧΘΥΣ"
     ichthys_color = blend(BG, bright, 0.7)
     draw.text((cx - 120, cy - 25), text, fill=ichthys_color, font=ichthys_font)
 
     # Data streams flowing through the fish
+    ctx.phase("rain")
     for col in range(cx - 500, cx + 500, 50):
         stream_len = random.randint(5, 12)
         start_y = random.randint(cy - 200, cy - 50)
@@ -1212,30 +2376,26 @@ def wallpaper_ichthys():
             draw.text((col, y), random.choice(MATRIX_CHARS), fill=color, font=font_sm)
 
     # Radial glow
-    for r in range(600, 0, -4):
-        a = 0.02 * (1 - r / 600) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - r, cx + r, cy + r],
-                         outline=blend(BG, green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy), 600, green, 0.02)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/11-ichthys.png", "PNG", optimize=True)
-    print("Saved backgrounds/11-ichthys.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 12. Praying Hands — hands in prayer with Matrix code
 # ─────────────────────────────────────────────────────────────
-def wallpaper_praying_hands():
+@register(12, "praying-hands", seed=316)  # John 3:16
+def wallpaper_praying_hands(ctx):
     """Praying hands silhouette composed of flowing Matrix characters."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(316)  # John 3:16
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(20)
-    font_lg = get_font(26)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(20)
+    font_lg = ctx.font(26)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1245,11 +2405,8 @@ def wallpaper_praying_hands():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     def in_praying_hands(px, py):
         """Praying hands: two hands pressed together, fingers pointing up."""
@@ -1299,6 +2456,7 @@ def wallpaper_praying_hands():
         return False
 
     # Fill with characters
+    ctx.phase("fill")
     step = 14
     for y in range(cy - 450, cy + 580, step):
         for x in range(cx - 350, cx + 350, step):
@@ -1321,17 +2479,13 @@ def wallpaper_praying_hands():
                 draw.text((x, y), char, fill=blend(BG, c, a), font=f)
 
     # Light emanating upward from fingertips
-    for angle_deg in range(-60, 61, 5):
-        angle = math.radians(angle_deg - 90)  # centered upward
-        for r in range(50, 800, 3):
-            x = cx + int(r * math.cos(angle))
-            y = (cy - 420) + int(r * math.sin(angle))
-            if 0 <= x < W and 0 <= y < H:
-                a = 0.05 * (1 - r / 800) ** 2
-                if a > 0.002:
-                    draw.point((x, y), fill=blend(BG, gold, a))
+    ctx.phase("rays")
+    # Centered upward: -90 degrees is straight up.
+    ctx.rays(img, (cx, cy - 420), range(-150, -29, 5), (50, 800, 3), gold, 0.05, 2,
+             floor=0.002)
 
     # Small cross above the hands
+    ctx.phase("cross")
     cross_cy = cy - 520
     cross_h = 100
     cross_w = 60
@@ -1348,31 +2502,27 @@ def wallpaper_praying_hands():
                           fill=blend(BG, bright, a), font=font_lg)
 
     # Radial glow
-    for r in range(500, 0, -3):
-        a = 0.025 * (1 - r / 500) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - 100 - r, cx + r, cy - 100 + r],
-                         outline=blend(BG, green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy - 100), 500, green, 0.025)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/12-praying-hands.png", "PNG", optimize=True)
-    print("Saved backgrounds/12-praying-hands.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 13. Alice Rabbit & Time — Alice rabbit with a clock and Eccl 3:1
 # ─────────────────────────────────────────────────────────────
-def wallpaper_alice_time():
+@register(13, "alice-time", seed=1234)
+def wallpaper_alice_time(ctx):
     """Alice in Wonderland rabbit with a clock and Ecclesiastes 3:1."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(1234)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(16)
-    font_md = get_font(22)
-    font_lg = get_font(32)
-    font_verse = get_font(40)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(16)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(32)
+    font_verse = ctx.font(40)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1381,11 +2531,8 @@ def wallpaper_alice_time():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     def in_rabbit(px, py):
         """Simple rabbit silhouette (Alice style with waistcoat/clock)."""
@@ -1420,6 +2567,7 @@ def wallpaper_alice_time():
         return None
 
     # Fill rabbit
+    ctx.phase("fill")
     step = 14
     for y in range(cy - 400, cy + 600, step):
         for x in range(cx - 700, cx - 100, step):
@@ -1438,33 +2586,34 @@ def wallpaper_alice_time():
                 draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, 0.3), font=font_sm)
 
     # Clock hands
+    ctx.phase("clock hands")
     draw.line([(cx+400, cy), (cx+400, cy-150)], fill=blend(BG, bright, 0.9), width=4)
     draw.line([(cx+400, cy), (cx+520, cy+50)], fill=blend(BG, bright, 0.9), width=4)
 
     # Verse: Ecclesiastes 3:1
+    ctx.phase("verse")
     verse = "To everything there is a season, and a time to every purpose under the heaven."
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, cy - 400), verse, fill=blend(BG, bright, 0.8), font=font_verse)
     draw.text(((W - draw.textlength("ECCLESIASTES 3:1", font=font_md)) // 2, cy - 340), "ECCLESIASTES 3:1", fill=blend(BG, green, 0.6), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/13-alice-time.png", "PNG", optimize=True)
-    print("Saved backgrounds/13-alice-time.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 14. Kingdom of God — Crown and Daniel 2:44
 # ─────────────────────────────────────────────────────────────
-def wallpaper_kingdom():
+@register(14, "kingdom", seed=244)
+def wallpaper_kingdom(ctx):
     """Kingdom of God Crown with Daniel 2:44."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(244)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_md = get_font(24)
-    font_lg = get_font(40)
-    font_verse = get_font(36)
+    font_bg = ctx.font(10)
+    font_md = ctx.font(24)
+    font_lg = ctx.font(40)
+    font_verse = ctx.font(36)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1473,11 +2622,8 @@ def wallpaper_kingdom():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     def in_crown(px, py):
         """Regal crown silhouette."""
@@ -1495,6 +2641,7 @@ def wallpaper_kingdom():
         return None
 
     # Fill crown
+    ctx.phase("fill")
     step = 16
     for y in range(cy - 400, cy + 400, step):
         for x in range(cx - 500, cx + 500, step):
@@ -1505,35 +2652,36 @@ def wallpaper_kingdom():
                 draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, c, a), font=font_md)
 
     # Verse: Daniel 2:44
+    ctx.phase("verse")
     verse = "And the God of heaven will set up a kingdom which shall never be destroyed."
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, cy + 300), verse, fill=blend(BG, bright, 0.8), font=font_verse)
     draw.text(((W - draw.textlength("DANIEL 2:44", font=font_md)) // 2, cy + 360), "DANIEL 2:44", fill=blend(BG, green, 0.6), font=font_md)
 
     # Glow rays
+    ctx.phase("rays")
     for i in range(200):
         length = random.randint(300, 600)
         angle = random.uniform(0, 2*math.pi)
         draw.line([(cx, cy), (cx + length*math.cos(angle), cy + length*math.sin(angle))], fill=blend(BG, gold, 0.1), width=1)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/14-kingdom.png", "PNG", optimize=True)
-    print("Saved backgrounds/14-kingdom.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 15. Armor of God — Shield and Ephesians 6:11
 # ─────────────────────────────────────────────────────────────
-def wallpaper_armor():
+@register(15, "armor", seed=611)
+def wallpaper_armor(ctx):
     """Armor of God Shield with Ephesians 6:11."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(611)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_md = get_font(24)
-    font_lg = get_font(40)
-    font_verse = get_font(36)
+    font_bg = ctx.font(10)
+    font_md = ctx.font(24)
+    font_lg = ctx.font(40)
+    font_verse = ctx.font(36)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1541,11 +2689,8 @@ def wallpaper_armor():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     def in_shield(px, py):
         """Knight shield silhouette."""
@@ -1559,6 +2704,7 @@ def wallpaper_armor():
         return False
 
     # Fill shield
+    ctx.phase("fill")
     step = 16
     for y in range(cy - 500, cy + 500, step):
         for x in range(cx - 400, cx + 400, step):
@@ -1567,36 +2713,37 @@ def wallpaper_armor():
                 draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_md)
 
     # Cross on shield
+    ctx.phase("cross")
     for y in range(cy - 400, cy + 200, 20):
         draw.text((cx-10, y), "✝", fill=blend(BG, bright, 0.9), font=font_lg)
     for x in range(cx - 150, cx + 150, 20):
         draw.text((x, cy-150), "✝", fill=blend(BG, bright, 0.9), font=font_lg)
 
     # Verse: Ephesians 6:11
+    ctx.phase("verse")
     verse = "Put on the whole armor of God, that you may be able to stand against the wiles of the devil."
     # Wrap text manually if needed or use small font
-    font_v = get_font(30)
+    font_v = ctx.font(30)
     draw.text((cx - 700, cy + 400), verse, fill=blend(BG, bright, 0.8), font=font_v)
     draw.text((cx - 100, cy + 450), "EPHESIANS 6:11", fill=blend(BG, green, 0.6), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/15-armor.png", "PNG", optimize=True)
-    print("Saved backgrounds/15-armor.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 16. Lamb of God — Lamb silhouette and John 1:29
 # ─────────────────────────────────────────────────────────────
-def wallpaper_lamb():
+@register(16, "lamb", seed=129)
+def wallpaper_lamb(ctx):
     """Lamb of God with John 1:29."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(129)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_md = get_font(24)
-    font_lg = get_font(40)
-    font_verse = get_font(36)
+    font_bg = ctx.font(10)
+    font_md = ctx.font(24)
+    font_lg = ctx.font(40)
+    font_verse = ctx.font(36)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1604,11 +2751,8 @@ def wallpaper_lamb():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     def in_lamb(px, py):
         """Simple lamb silhouette."""
@@ -1626,6 +2770,7 @@ def wallpaper_lamb():
         return False
 
     # Fill lamb
+    ctx.phase("fill")
     step = 14
     for y in range(cy - 300, cy + 300, step):
         for x in range(cx - 500, cx + 500, step):
@@ -1634,31 +2779,31 @@ def wallpaper_lamb():
                 draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, bright, a), font=font_md)
 
     # Verse: John 1:29
+    ctx.phase("verse")
     verse = "Behold! The Lamb of God who takes away the sin of the world!"
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, cy + 350), verse, fill=blend(BG, bright, 0.8), font=font_verse)
     draw.text(((W - draw.textlength("JOHN 1:29", font=font_md)) // 2, cy + 410), "JOHN 1:29", fill=blend(BG, green, 0.6), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/16-lamb.png", "PNG", optimize=True)
-    print("Saved backgrounds/16-lamb.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 17. Alpha & Omega — Symbols and Revelation 22:13
 # ─────────────────────────────────────────────────────────────
-def wallpaper_alpha_omega():
+@register(17, "alpha-omega", seed=2213)
+def wallpaper_alpha_omega(ctx):
     """Alpha & Omega symbols with Revelation 22:13."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(2213)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(20)
-    font_md = get_font(24)
-    font_lg = get_font(50)
-    font_xl = get_font(300)
-    font_verse = get_font(36)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(20)
+    font_md = ctx.font(24)
+    font_lg = ctx.font(50)
+    font_xl = ctx.font(300)
+    font_verse = ctx.font(36)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1666,17 +2811,16 @@ def wallpaper_alpha_omega():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     # Alpha & Omega text
+    ctx.phase("text")
     draw.text((cx - 600, cy - 200), "Α", fill=blend(BG, bright, 0.4), font=font_xl)
     draw.text((cx + 200, cy - 200), "Ω", fill=blend(BG, bright, 0.4), font=font_xl)
 
     # Central vortex of code
+    ctx.phase("vortex")
     for i in range(1000):
         radius = random.uniform(10, 800)
         angle = random.uniform(0, 2*math.pi)
@@ -1686,31 +2830,31 @@ def wallpaper_alpha_omega():
         draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_sm)
 
     # Verse: Revelation 22:13
+    ctx.phase("verse")
     verse = "I am Alpha and Omega, the beginning and the end, the first and the last."
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, cy + 400), verse, fill=blend(BG, bright, 0.8), font=font_verse)
     draw.text(((W - draw.textlength("REVELATION 22:13", font=font_md)) // 2, cy + 460), "REVELATION 22:13", fill=blend(BG, green, 0.6), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/17-alpha-omega.png", "PNG", optimize=True)
-    print("Saved backgrounds/17-alpha-omega.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 18. Burning Bush — Exodus 3:14 "I AM THAT I AM"
 # ─────────────────────────────────────────────────────────────
-def wallpaper_burning_bush():
+@register(18, "burning-bush", seed=314)
+def wallpaper_burning_bush(ctx):
     """Burning bush with Matrix flames and Exodus 3:14."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(314)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(42)
-    font_iam = get_font(80)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(42)
+    font_iam = ctx.font(80)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1721,13 +2865,11 @@ def wallpaper_burning_bush():
     cx, cy = W // 2, H // 2 + 100
 
     # Background scatter
-    for _ in range(5000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 5000, MATRIX_CHARS, green, (0.02, 0.04), font_bg)
 
     # Bush trunk / base
+    ctx.phase("trunk")
     trunk_w = 60
     for y in range(cy + 100, cy + 350, 14):
         for x in range(cx - trunk_w // 2, cx + trunk_w // 2, 14):
@@ -1737,42 +2879,39 @@ def wallpaper_burning_bush():
                       fill=blend(BG, green, a), font=font_md)
 
     # Bush canopy — dense tree shape filled with "flames"
+    ctx.phase("fill")
     def in_bush(px, py):
         nx = (px - cx) / 500
         ny = (py - cy) / 350
         # Oval canopy shape, wider at bottom
-        if ny > 0.3 or ny < -0.9:
-            return False
         canopy_w = 0.7 * (1 - ((ny + 0.3) / 1.2) ** 2) ** 0.5
-        if abs(nx) < canopy_w:
-            return True
-        return False
+        return (-0.9 <= ny) & (ny <= 0.3) & (abs(nx) < canopy_w)
 
     # Fill bush with flame-like characters
     step = 14
-    for y in range(cy - 350, cy + 150, step):
-        for x in range(cx - 450, cx + 450, step):
-            if in_bush(x, y):
-                char = random.choice(chars)
-                ny = (y - cy) / 350
-                # flicker intensity — brighter at top
-                flicker = random.uniform(0.5, 1.0)
-                if ny < -0.4:
-                    a = 0.90 * flicker
-                    c = fire_bright
-                    f = font_lg
-                elif ny < 0:
-                    a = 0.70 * flicker
-                    c = fire_green
-                    f = font_md
-                else:
-                    a = 0.50 * flicker
-                    c = green
-                    f = font_sm
-                draw.text((x + random.randint(-3, 3), y + random.randint(-3, 3)),
-                          char, fill=blend(BG, c, a), font=f)
+    grid = ShapeGrid(range(cx - 450, cx + 450, step), range(cy - 350, cy + 150, step))
+    for x, y in grid.cells(grid.eval(in_bush)):
+        char = random.choice(chars)
+        ny = (y - cy) / 350
+        # flicker intensity — brighter at top
+        flicker = random.uniform(0.5, 1.0)
+        if ny < -0.4:
+            a = 0.90 * flicker
+            c = fire_bright
+            f = font_lg
+        elif ny < 0:
+            a = 0.70 * flicker
+            c = fire_green
+            f = font_md
+        else:
+            a = 0.50 * flicker
+            c = green
+            f = font_sm
+        draw.text((x + random.randint(-3, 3), y + random.randint(-3, 3)),
+                  char, fill=blend(BG, c, a), font=f)
 
     # Rising "flames" — streams going upward above the bush
+    ctx.phase("flames")
     for col in range(cx - 350, cx + 350, 30):
         stream_len = random.randint(5, 18)
         start_y = cy - 320
@@ -1788,6 +2927,7 @@ def wallpaper_burning_bush():
                       fill=blend(BG, c, a), font=font_sm)
 
     # "I AM THAT I AM" — glowing text
+    ctx.phase("text")
     iam_text = "I  A M  T H A T  I  A M"
     tw = draw.textlength(iam_text, font=font_iam)
     iam_x = (W - tw) // 2
@@ -1802,6 +2942,7 @@ def wallpaper_burning_bush():
     draw.text((iam_x, iam_y), iam_text, fill=blend(BG, bright, 0.92), font=font_iam)
 
     # Verse reference
+    ctx.phase("verse")
     verse = '"And God said unto Moses, I AM THAT I AM"'
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, cy + 400), verse, fill=blend(BG, bright, 0.75), font=font_verse)
@@ -1810,31 +2951,27 @@ def wallpaper_burning_bush():
     draw.text(((W - tw) // 2, cy + 460), ref, fill=blend(BG, green, 0.55), font=font_md)
 
     # Radiant glow behind bush
-    for r in range(600, 0, -5):
-        a = 0.025 * (1 - r / 600) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - 100 - r, cx + r, cy - 100 + r],
-                         outline=blend(BG, fire_green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy - 100), 600, fire_green, 0.025)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/18-burning-bush.png", "PNG", optimize=True)
-    print("Saved backgrounds/18-burning-bush.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 19. Eye of Providence — Proverbs 15:3
 # ─────────────────────────────────────────────────────────────
-def wallpaper_eye_of_providence():
+@register(19, "eye-of-providence", seed=153)
+def wallpaper_eye_of_providence(ctx):
     """All-seeing eye in a triangle with Proverbs 15:3."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(153)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(36)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(36)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1843,13 +2980,11 @@ def wallpaper_eye_of_providence():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(6000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.05)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 6000, MATRIX_CHARS, green, (0.02, 0.05), font_bg)
 
     # Triangle
+    ctx.phase("fill")
     tri_h = 800
     tri_w = 900
     top = (cx, cy - tri_h // 2)
@@ -1863,9 +2998,9 @@ def wallpaper_eye_of_providence():
         d1 = sign((px, py), top, bl)
         d2 = sign((px, py), bl, br)
         d3 = sign((px, py), br, top)
-        has_neg = (d1 < 0) or (d2 < 0) or (d3 < 0)
-        has_pos = (d1 > 0) or (d2 > 0) or (d3 > 0)
-        return not (has_neg and has_pos)
+        has_neg = (d1 < 0) | (d2 < 0) | (d3 < 0)
+        has_pos = (d1 > 0) | (d2 > 0) | (d3 > 0)
+        return np.logical_not(has_neg & has_pos)
 
     def tri_edge_dist(px, py):
         """Approximate distance to triangle edges."""
@@ -1879,29 +3014,29 @@ def wallpaper_eye_of_providence():
                 continue
             d = abs(dy*px - dx*py + x2*y1 - y2*x1) / length
             dists.append(d)
-        return min(dists) if dists else 999
+        return functools.reduce(np.minimum, dists) if dists else 999
 
     # Fill triangle with characters
     step = 16
-    for y in range(cy - tri_h // 2 - 10, cy + tri_h // 2 + 10, step):
-        for x in range(cx - tri_w // 2 - 10, cx + tri_w // 2 + 10, step):
-            if in_triangle(x, y):
-                ed = tri_edge_dist(x, y)
-                if ed < 30:
-                    a = random.uniform(0.70, 0.90)
-                    c = bright
-                    f = font_lg
-                elif ed < 70:
-                    a = random.uniform(0.40, 0.60)
-                    c = green
-                    f = font_md
-                else:
-                    a = random.uniform(0.15, 0.35)
-                    c = green
-                    f = font_sm
-                draw.text((x, y), random.choice(chars), fill=blend(BG, c, a), font=f)
+    grid = ShapeGrid(range(cx - tri_w // 2 - 10, cx + tri_w // 2 + 10, step),
+                     range(cy - tri_h // 2 - 10, cy + tri_h // 2 + 10, step))
+    for x, y, ed in grid.cells(grid.eval(in_triangle), grid.eval(tri_edge_dist)):
+        if ed < 30:
+            a = random.uniform(0.70, 0.90)
+            c = bright
+            f = font_lg
+        elif ed < 70:
+            a = random.uniform(0.40, 0.60)
+            c = green
+            f = font_md
+        else:
+            a = random.uniform(0.15, 0.35)
+            c = green
+            f = font_sm
+        draw.text((x, y), random.choice(chars), fill=blend(BG, c, a), font=f)
 
     # Eye in the center
+    ctx.phase("eye")
     eye_cy = cy + 30
     eye_rx = 180
     eye_ry = 90
@@ -1936,19 +3071,14 @@ def wallpaper_eye_of_providence():
                   fill=blend(BG, green, a), font=font_sm)
 
     # Light rays from the eye
-    for angle_deg in range(0, 360, 10):
-        angle = math.radians(angle_deg)
-        for r in range(100, 800, 3):
-            x = cx + int(r * math.cos(angle))
-            y = eye_cy + int(r * math.sin(angle))
-            if in_triangle(x, y) and 0 <= x < W and 0 <= y < H:
-                a = 0.05 * (1 - r / 800) ** 1.5
-                if a > 0.003:
-                    draw.point((x, y), fill=blend(BG, bright, a))
+    ctx.phase("rays")
+    ctx.rays(img, (cx, eye_cy), range(0, 360, 10), (100, 800, 3), bright, 0.05, 1.5,
+             where=in_triangle, floor=0.003)
 
     # Verse
+    ctx.phase("verse")
     verse = '"The eyes of the LORD are in every place, beholding the evil and the good."'
-    font_v = get_font(32)
+    font_v = ctx.font(32)
     tw = draw.textlength(verse, font=font_v)
     draw.text(((W - tw) // 2, cy + tri_h // 2 + 50), verse,
               fill=blend(BG, bright, 0.75), font=font_v)
@@ -1957,25 +3087,24 @@ def wallpaper_eye_of_providence():
     draw.text(((W - tw) // 2, cy + tri_h // 2 + 100), ref,
               fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/19-eye-of-providence.png", "PNG", optimize=True)
-    print("Saved backgrounds/19-eye-of-providence.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 20. Lion of Judah — Revelation 5:5
 # ─────────────────────────────────────────────────────────────
-def wallpaper_lion_of_judah():
+@register(20, "lion-of-judah", seed=505)
+def wallpaper_lion_of_judah(ctx):
     """Lion face silhouette made of Matrix characters with Revelation 5:5."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(505)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(20)
-    font_lg = get_font(28)
-    font_verse = get_font(34)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(20)
+    font_lg = ctx.font(28)
+    font_verse = ctx.font(34)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -1985,11 +3114,8 @@ def wallpaper_lion_of_judah():
     cx, cy = W // 2, H // 2 - 50
 
     # Background scatter
-    for _ in range(5000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 5000, MATRIX_CHARS, green, (0.02, 0.04), font_bg)
 
     def in_lion(px, py):
         """Lion face: mane ring + face + ears."""
@@ -1999,12 +3125,9 @@ def wallpaper_lion_of_judah():
         # Mane (large fuzzy circle)
         mane_dist = nx**2 + ny**2
         # Irregular mane edge using sin waves
-        angle = math.atan2(ny, nx)
-        mane_r = 0.85 + 0.15 * math.sin(angle * 7) + 0.08 * math.sin(angle * 13)
-        if mane_dist < mane_r**2:
-            return "mane"
-
-        return None
+        angle = np.arctan2(ny, nx)
+        mane_r = 0.85 + 0.15 * np.sin(angle * 7) + 0.08 * np.sin(angle * 13)
+        return np.where(mane_dist < mane_r**2, "mane", "")
 
     def in_lion_face(px, py):
         """Inner lion face features."""
@@ -2013,64 +3136,57 @@ def wallpaper_lion_of_judah():
 
         # Face (smaller inner oval)
         face_dist = (nx / 0.45)**2 + ((ny + 0.05) / 0.55)**2
-        if face_dist < 1:
-            # Eyes
-            for ex in [-0.18, 0.18]:
-                if (nx - ex)**2 + (ny + 0.12)**2 < 0.004:
-                    return "eye"
-            # Nose
-            if abs(nx) < 0.06 and -0.02 < ny < 0.10:
-                return "nose"
-            # Mouth
-            if abs(ny - 0.18) < 0.02 and abs(nx) < 0.12:
-                return "mouth"
-            return "face"
-        return None
+        # Eyes
+        eye = ((nx + 0.18)**2 + (ny + 0.12)**2 < 0.004) | ((nx - 0.18)**2 + (ny + 0.12)**2 < 0.004)
+        # Nose
+        nose = (abs(nx) < 0.06) & (-0.02 < ny) & (ny < 0.10)
+        # Mouth
+        mouth = (abs(ny - 0.18) < 0.02) & (abs(nx) < 0.12)
+        part = np.select([eye, nose, mouth], ["eye", "nose", "mouth"], "face")
+        return np.where(face_dist < 1, part, "")
 
     # Fill mane
+    ctx.phase("fill")
     step = 14
-    for y in range(cy - 520, cy + 520, step):
-        for x in range(cx - 520, cx + 520, step):
-            part = in_lion(x, y)
-            face_part = in_lion_face(x, y)
-
-            if face_part == "eye":
-                # Bright glowing eyes
-                draw.text((x, y), random.choice("01"),
-                          fill=blend(BG, bright, 0.95), font=font_lg)
-            elif face_part == "nose":
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, bright, 0.7), font=font_md)
-            elif face_part == "mouth":
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, green, 0.5), font=font_sm)
-            elif face_part == "face":
-                a = random.uniform(0.25, 0.45)
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, green, a), font=font_sm)
-            elif part == "mane":
-                # Mane: denser, brighter at outer edge
-                nx = (x - cx) / 500
-                ny = (y - cy) / 500
-                dist = math.sqrt(nx**2 + ny**2)
-                if dist > 0.6:
-                    a = random.uniform(0.55, 0.85)
-                    c = gold
-                    f = font_lg
-                else:
-                    a = random.uniform(0.35, 0.55)
-                    c = green
-                    f = font_md
-                draw.text((x, y), random.choice(chars), fill=blend(BG, c, a), font=f)
+    grid = ShapeGrid(range(cx - 520, cx + 520, step), range(cy - 520, cy + 520, step))
+    parts = grid.eval(in_lion)
+    face_parts = grid.eval(in_lion_face)
+    for x, y, part, face_part in grid.cells((parts != "") | (face_parts != ""), parts, face_parts):
+        if face_part == "eye":
+            # Bright glowing eyes
+            draw.text((x, y), random.choice("01"),
+                      fill=blend(BG, bright, 0.95), font=font_lg)
+        elif face_part == "nose":
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, bright, 0.7), font=font_md)
+        elif face_part == "mouth":
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, green, 0.5), font=font_sm)
+        elif face_part == "face":
+            a = random.uniform(0.25, 0.45)
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, green, a), font=font_sm)
+        elif part == "mane":
+            # Mane: denser, brighter at outer edge
+            nx = (x - cx) / 500
+            ny = (y - cy) / 500
+            dist = math.sqrt(nx**2 + ny**2)
+            if dist > 0.6:
+                a = random.uniform(0.55, 0.85)
+                c = gold
+                f = font_lg
+            else:
+                a = random.uniform(0.35, 0.55)
+                c = green
+                f = font_md
+            draw.text((x, y), random.choice(chars), fill=blend(BG, c, a), font=f)
 
     # Radial glow
-    for r in range(600, 0, -4):
-        a = 0.02 * (1 - r / 600) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - r, cx + r, cy + r],
-                         outline=blend(BG, gold, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy), 600, gold, 0.02)
 
     # Verse
+    ctx.phase("verse")
     verse = '"The Lion of the tribe of Judah, the Root of David, has prevailed."'
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, cy + 520), verse,
@@ -2080,25 +3196,24 @@ def wallpaper_lion_of_judah():
     draw.text(((W - tw2) // 2, cy + 570), ref,
               fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.4))
-    img.save("backgrounds/20-lion-of-judah.png", "PNG", optimize=True)
-    print("Saved backgrounds/20-lion-of-judah.png")
+    img = ctx.blur(img, 0.4)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 21. Narrow Gate — Matthew 7:14
 # ─────────────────────────────────────────────────────────────
-def wallpaper_narrow_gate():
+@register(21, "narrow-gate", seed=714)
+def wallpaper_narrow_gate(ctx):
     """A narrow glowing gate/doorway with Matrix rain flowing through it."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(714)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(34)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(34)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2107,13 +3222,11 @@ def wallpaper_narrow_gate():
     cx, cy = W // 2, H // 2
 
     # Background — dense Matrix rain everywhere (the "wide path")
-    for _ in range(10000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.03, 0.10)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 10000, MATRIX_CHARS, green, (0.03, 0.10), font_bg)
 
     # Gate dimensions
+    ctx.phase("fill")
     gate_w = 200
     gate_h = 900
     gate_top = cy - gate_h // 2 - 50
@@ -2161,6 +3274,7 @@ def wallpaper_narrow_gate():
                           fill=blend(BG, bright, a), font=font_md)
 
     # Light streaming through the gate (inside the opening)
+    ctx.phase("rays")
     for y in range(gate_top, gate_bot, step):
         for x in range(cx - gate_w // 2 + 5, cx + gate_w // 2 - 5, step):
             if in_gate(x, y):
@@ -2171,6 +3285,7 @@ def wallpaper_narrow_gate():
                           fill=blend(BG, bright, a), font=font_sm)
 
     # Matrix rain streams pouring through the gate
+    ctx.phase("rain")
     for col in range(cx - gate_w // 2 + 10, cx + gate_w // 2 - 10, 20):
         stream_len = random.randint(15, 35)
         start_y = random.randint(gate_top, gate_top + 200)
@@ -2186,17 +3301,13 @@ def wallpaper_narrow_gate():
             draw.text((col, y), random.choice(MATRIX_CHARS), fill=color, font=font_sm)
 
     # Radiant light from gate toward viewer
-    for angle_deg in range(-30, 31, 3):
-        angle = math.radians(angle_deg + 90)
-        for r in range(gate_h // 2, gate_h, 3):
-            x = cx + int(r * math.cos(angle) * 2)
-            y = gate_bot + int(r * math.sin(angle))
-            if 0 <= x < W and 0 <= y < H:
-                a = 0.04 * (1 - (r - gate_h // 2) / (gate_h // 2)) ** 1.5
-                if a > 0.002:
-                    draw.point((x, y), fill=blend(BG, bright, a))
+    ctx.phase("glow")
+    half = gate_h // 2
+    ctx.rays(img, (cx, gate_bot), range(60, 121, 3), (half, gate_h, 3), bright, 0.04, 1.5,
+             falloff=(half, 2 * half), stretch=2, floor=0.002)
 
     # Verse
+    ctx.phase("verse")
     verse = '"Narrow is the gate, and few there be that find it."'
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, gate_bot + 80), verse,
@@ -2206,25 +3317,24 @@ def wallpaper_narrow_gate():
     draw.text(((W - tw2) // 2, gate_bot + 130), ref,
               fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/21-narrow-gate.png", "PNG", optimize=True)
-    print("Saved backgrounds/21-narrow-gate.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 22. Sword of the Spirit — Hebrews 4:12
 # ─────────────────────────────────────────────────────────────
-def wallpaper_sword_of_spirit():
+@register(22, "sword-of-spirit", seed=412)
+def wallpaper_sword_of_spirit(ctx):
     """A sword of the Spirit made of Matrix characters with Hebrews 4:12."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(412)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(32)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(32)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2233,13 +3343,11 @@ def wallpaper_sword_of_spirit():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(5000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 5000, MATRIX_CHARS, green, (0.02, 0.04), font_bg)
 
     # Sword pointing upward, centered
+    ctx.phase("fill")
     sword_len = 1400
     blade_w = 50
     guard_w = 300
@@ -2257,69 +3365,59 @@ def wallpaper_sword_of_spirit():
 
     def in_sword(px, py):
         """Sword shape: blade + guard + grip + pommel."""
-        # Blade (tapers to point at top)
-        if blade_top < py < blade_bot:
-            t = (py - blade_top) / (blade_bot - blade_top)
-            w = blade_w * t  # wider at bottom, pointed at top
-            if abs(px - cx) < w / 2:
-                return "blade"
-
-        # Blade edge highlight
-        if blade_top < py < blade_bot:
-            t = (py - blade_top) / (blade_bot - blade_top)
-            w = blade_w * t
-            if abs(abs(px - cx) - w / 2) < 5:
-                return "edge"
-
-        # Guard / crossguard
-        if abs(py - guard_y) < guard_h // 2:
-            if abs(px - cx) < guard_w // 2:
-                # Taper at ends
-                t = abs(px - cx) / (guard_w // 2)
-                if abs(py - guard_y) < (guard_h // 2) * (1 - t * 0.3):
-                    return "guard"
+        # Blade (tapers to point at top), with an edge highlight
+        in_blade = (blade_top < py) & (py < blade_bot)
+        t = (py - blade_top) / (blade_bot - blade_top)
+        w = blade_w * t  # wider at bottom, pointed at top
+        blade = in_blade & (abs(px - cx) < w / 2)
+        edge = in_blade & (abs(abs(px - cx) - w / 2) < 5)
+
+        # Guard / crossguard, tapering at the ends
+        t = abs(px - cx) / (guard_w // 2)
+        guard = ((abs(py - guard_y) < guard_h // 2) & (abs(px - cx) < guard_w // 2)
+                 & (abs(py - guard_y) < (guard_h // 2) * (1 - t * 0.3)))
 
         # Grip
-        if grip_top < py < grip_bot:
-            if abs(px - cx) < grip_w // 2:
-                return "grip"
+        grip = (grip_top < py) & (py < grip_bot) & (abs(px - cx) < grip_w // 2)
 
         # Pommel
-        if (px - cx)**2 + (py - pommel_cy)**2 < pommel_r**2:
-            return "pommel"
+        pommel = (px - cx)**2 + (py - pommel_cy)**2 < pommel_r**2
 
-        return None
+        return np.select([blade, edge, guard, grip, pommel],
+                         ["blade", "edge", "guard", "grip", "pommel"], "")
 
     # Fill sword with characters
     step = 14
-    for y in range(blade_top - 10, int(pommel_cy + pommel_r + 10), step):
-        for x in range(cx - guard_w // 2 - 10, cx + guard_w // 2 + 10, step):
-            part = in_sword(x, y)
-            if part == "edge":
-                draw.text((x, y), random.choice("01"),
-                          fill=blend(BG, bright, 0.95), font=font_lg)
-            elif part == "blade":
-                # Brighter near center line
-                dist = abs(x - cx) / (blade_w / 2)
-                a = random.uniform(0.45, 0.75) * (1 - dist * 0.3)
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, green, a), font=font_md)
-            elif part == "guard":
-                a = random.uniform(0.60, 0.85)
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, bright, a), font=font_lg)
-            elif part == "grip":
-                # Wrapped grip pattern
-                stripe = int(math.sin(y * 0.2) * 3) > 0
-                a = 0.65 if stripe else 0.45
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, green, a), font=font_md)
-            elif part == "pommel":
-                a = random.uniform(0.55, 0.80)
-                draw.text((x, y), random.choice(chars),
-                          fill=blend(BG, bright, a), font=font_md)
+    grid = ShapeGrid(range(cx - guard_w // 2 - 10, cx + guard_w // 2 + 10, step),
+                     range(blade_top - 10, int(pommel_cy + pommel_r + 10), step))
+    parts = grid.eval(in_sword)
+    for x, y, part in grid.cells(parts != "", parts):
+        if part == "edge":
+            draw.text((x, y), random.choice("01"),
+                      fill=blend(BG, bright, 0.95), font=font_lg)
+        elif part == "blade":
+            # Brighter near center line
+            dist = abs(x - cx) / (blade_w / 2)
+            a = random.uniform(0.45, 0.75) * (1 - dist * 0.3)
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, green, a), font=font_md)
+        elif part == "guard":
+            a = random.uniform(0.60, 0.85)
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, bright, a), font=font_lg)
+        elif part == "grip":
+            # Wrapped grip pattern
+            stripe = int(math.sin(y * 0.2) * 3) > 0
+            a = 0.65 if stripe else 0.45
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, green, a), font=font_md)
+        elif part == "pommel":
+            a = random.uniform(0.55, 0.80)
+            draw.text((x, y), random.choice(chars),
+                      fill=blend(BG, bright, a), font=font_md)
 
     # Energy radiating from blade edges
+    ctx.phase("rays")
     for y in range(blade_top, blade_bot, 8):
         t = (y - blade_top) / (blade_bot - blade_top)
         w = blade_w * t / 2
@@ -2332,6 +3430,7 @@ def wallpaper_sword_of_spirit():
                     draw.point((ex, y), fill=blend(BG, bright, a))
 
     # Verse
+    ctx.phase("verse")
     verse1 = '"For the word of God is living and active, sharper than any two-edged sword,'
     verse2 = 'piercing to the division of soul and spirit."'
     tw1 = draw.textlength(verse1, font=font_verse)
@@ -2345,26 +3444,25 @@ def wallpaper_sword_of_spirit():
     draw.text(((W - tw) // 2, pommel_cy + 175), ref,
               fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/22-sword-of-spirit.png", "PNG", optimize=True)
-    print("Saved backgrounds/22-sword-of-spirit.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 23. Digital Genesis — God coding the universe (John 1:1)
 # ─────────────────────────────────────────────────────────────
-def wallpaper_digital_genesis():
+@register(23, "digital-genesis", seed=101)
+def wallpaper_digital_genesis(ctx):
     """Terminal showing God 'compiling' the universe — John 1:1."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(101)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(16)
-    font_md = get_font(22)
-    font_lg = get_font(28)
-    font_term = get_font(20)
-    font_verse = get_font(36)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(16)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(28)
+    font_term = ctx.font(20)
+    font_verse = ctx.font(36)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2374,13 +3472,11 @@ def wallpaper_digital_genesis():
     cx, cy = W // 2, H // 2
 
     # Background scatter — faint stars / data dust
-    for _ in range(4000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.01, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 4000, MATRIX_CHARS, green, (0.01, 0.04), font_bg)
 
     # Terminal window
+    ctx.phase("terminal")
     term_x = 400
     term_y = 200
     term_w = W - 800
@@ -2448,6 +3544,7 @@ def wallpaper_digital_genesis():
         line_y += line_h
 
     # Matrix rain outside the terminal (cosmic data)
+    ctx.phase("rain")
     for col in range(0, W, 40):
         if term_x < col < term_x + term_w:
             continue
@@ -2465,6 +3562,7 @@ def wallpaper_digital_genesis():
             draw.text((col, y), random.choice(MATRIX_CHARS), fill=color, font=font_sm)
 
     # Stars/galaxies forming above terminal
+    ctx.phase("stars")
     for _ in range(300):
         x = random.randint(0, W)
         y = random.randint(0, term_y - 20)
@@ -2473,6 +3571,7 @@ def wallpaper_digital_genesis():
         draw.ellipse([x-r, y-r, x+r, y+r], fill=blend(BG, bright, a))
 
     # Verse at bottom
+    ctx.phase("verse")
     verse = '"In the beginning was the Word, and the Word was with God, and the Word was God."'
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, H - 150), verse, fill=blend(BG, bright, 0.75), font=font_verse)
@@ -2480,25 +3579,24 @@ def wallpaper_digital_genesis():
     tw = draw.textlength(ref, font=font_md)
     draw.text(((W - tw) // 2, H - 95), ref, fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/23-digital-genesis.png", "PNG", optimize=True)
-    print("Saved backgrounds/23-digital-genesis.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 24. Matrix Baptism — Data cascade baptism (Romans 6:4)
 # ─────────────────────────────────────────────────────────────
-def wallpaper_matrix_baptism():
+@register(24, "matrix-baptism", seed=604)
+def wallpaper_matrix_baptism(ctx):
     """Figure being baptized in a cascade of Matrix data — Romans 6:4."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(604)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(34)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(34)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2508,13 +3606,11 @@ def wallpaper_matrix_baptism():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(4000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 4000, MATRIX_CHARS, green, (0.02, 0.04), font_bg)
 
     # Water line — horizontal divide
+    ctx.phase("water")
     water_y = cy + 150
     # Water surface with wave effect
     for x in range(0, W, 3):
@@ -2532,43 +3628,42 @@ def wallpaper_matrix_baptism():
             draw.text((wave_x, y), char, fill=blend(BG, water_green, a), font=font_sm)
 
     # Figure emerging from water — upper body above, blending below
+    ctx.phase("fill")
     def in_figure(px, py):
         nx = (px - cx) / 250
         ny = (py - cy) / 400
 
         # Head
-        if nx**2 + (ny + 0.6)**2 < 0.04:
-            return "head"
+        head = nx**2 + (ny + 0.6)**2 < 0.04
         # Shoulders/upper body
-        if -0.35 < ny < -0.2 and abs(nx) < 0.3:
-            return "body"
+        body = (-0.35 < ny) & (ny < -0.2) & (abs(nx) < 0.3)
         # Arms raised upward and outward
-        if -0.7 < ny < -0.3:
-            for sign in [-1, 1]:
-                arm_x = sign * (0.3 + 0.2 * ((-ny - 0.3) / 0.4))
-                if abs(nx - arm_x) < 0.06:
-                    return "arms"
+        arms = False
+        for sign in [-1, 1]:
+            arm_x = sign * (0.3 + 0.2 * ((-ny - 0.3) / 0.4))
+            arms |= abs(nx - arm_x) < 0.06
+        arms &= (-0.7 < ny) & (ny < -0.3)
         # Lower body (submerged, fainter)
-        if -0.2 < ny < 0.6 and abs(nx) < 0.25 - 0.05 * max(0, ny):
-            return "submerged"
-        return None
+        submerged = (-0.2 < ny) & (ny < 0.6) & (abs(nx) < 0.25 - 0.05 * np.maximum(0, ny))
+        return np.select([head, body, arms, submerged], ["head", "body", "arms", "submerged"], "")
 
     # Fill figure
     step = 12
-    for y in range(cy - 350, cy + 400, step):
-        for x in range(cx - 250, cx + 250, step):
-            part = in_figure(x, y)
-            if part == "head":
-                a = random.uniform(0.75, 0.95)
-                draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, bright, a), font=font_lg)
-            elif part == "body" or part == "arms":
-                a = random.uniform(0.55, 0.80)
-                draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_md)
-            elif part == "submerged":
-                a = random.uniform(0.15, 0.35)
-                draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, water_green, a), font=font_sm)
+    grid = ShapeGrid(range(cx - 250, cx + 250, step), range(cy - 350, cy + 400, step))
+    parts = grid.eval(in_figure)
+    for x, y, part in grid.cells(parts != "", parts):
+        if part == "head":
+            a = random.uniform(0.75, 0.95)
+            draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, bright, a), font=font_lg)
+        elif part == "body" or part == "arms":
+            a = random.uniform(0.55, 0.80)
+            draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_md)
+        elif part == "submerged":
+            a = random.uniform(0.15, 0.35)
+            draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, water_green, a), font=font_sm)
 
     # Massive data cascade pouring down onto the figure from above
+    ctx.phase("rain")
     for col in range(cx - 200, cx + 200, 22):
         stream_len = random.randint(15, 40)
         for i in range(stream_len):
@@ -2584,6 +3679,7 @@ def wallpaper_matrix_baptism():
             draw.text((x, y), random.choice(MATRIX_CHARS), fill=color, font=font_md)
 
     # Splash particles where cascade meets water
+    ctx.phase("splash")
     for _ in range(150):
         angle = random.uniform(-math.pi, 0)
         r = random.uniform(20, 200)
@@ -2593,17 +3689,12 @@ def wallpaper_matrix_baptism():
         draw.text((x, y), random.choice("~≈•"), fill=blend(BG, water_green, a), font=font_sm)
 
     # Light radiating from figure
-    for angle_deg in range(0, 360, 8):
-        angle = math.radians(angle_deg)
-        for r in range(50, 500, 3):
-            x = cx + int(r * math.cos(angle))
-            y = cy - 100 + int(r * math.sin(angle))
-            if 0 <= x < W and 0 <= y < H:
-                a = 0.04 * (1 - r / 500) ** 2
-                if a > 0.002:
-                    draw.point((x, y), fill=blend(BG, bright, a))
+    ctx.phase("rays")
+    ctx.rays(img, (cx, cy - 100), range(0, 360, 8), (50, 500, 3), bright, 0.04, 2,
+             floor=0.002)
 
     # Verse
+    ctx.phase("verse")
     verse = '"We were buried with Him through baptism into death,'
     verse2 = 'that just as Christ was raised, we too may walk in newness of life."'
     tw = draw.textlength(verse, font=font_verse)
@@ -2614,25 +3705,24 @@ def wallpaper_matrix_baptism():
     tw = draw.textlength(ref, font=font_md)
     draw.text(((W - tw) // 2, H - 70), ref, fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/24-matrix-baptism.png", "PNG", optimize=True)
-    print("Saved backgrounds/24-matrix-baptism.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 25. Firewall of Faith — Cyber shield (Psalm 91:4)
 # ─────────────────────────────────────────────────────────────
-def wallpaper_firewall_faith():
+@register(25, "firewall-faith", seed=914)
+def wallpaper_firewall_faith(ctx):
     """Cybersecurity firewall protecting a cross — Psalm 91:4."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(914)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(32)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(32)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2644,13 +3734,11 @@ def wallpaper_firewall_faith():
     cx, cy = W // 2, H // 2
 
     # Background — hostile incoming attacks (red data streams from edges)
-    for _ in range(4000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 4000, MATRIX_CHARS, green, (0.02, 0.04), font_bg)
 
     # Incoming red attack streams from all sides
+    ctx.phase("attacks")
     for _ in range(80):
         side = random.choice(["top", "bottom", "left", "right"])
         if side == "top":
@@ -2682,6 +3770,7 @@ def wallpaper_firewall_faith():
                           fill=blend(BG, red_dim, a), font=font_sm)
 
     # Firewall — concentric hexagonal/circular shield rings
+    ctx.phase("shield")
     for ring in range(3):
         r = 400 + ring * 80
         segments = 60
@@ -2707,7 +3796,8 @@ def wallpaper_firewall_faith():
                           fill=blend(BG, green, a), font=font_sm)
 
     # Status overlay text — firewall logs
-    log_font = get_font(14)
+    ctx.phase("text")
+    log_font = ctx.font(14)
     logs = [
         ("[FIREWALL] ACTIVE — Shield of Faith: ENGAGED", green, 0.5),
         ("[BLOCKED] 666 malicious packets dropped", red_dim, 0.4),
@@ -2719,6 +3809,7 @@ def wallpaper_firewall_faith():
         draw.text((80, 80 + i * 26), text, fill=blend(BG, color, alpha), font=log_font)
 
     # Cross in the center (protected)
+    ctx.phase("cross")
     cross_h = 300
     cross_w = 180
     beam = 40
@@ -2732,12 +3823,11 @@ def wallpaper_firewall_faith():
                 draw.text((x, y), random.choice("✝†"), fill=blend(BG, bright, a), font=font_lg)
 
     # Glow behind cross
-    for r in range(350, 0, -4):
-        a = 0.025 * (1 - r / 350) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, cy - r, cx + r, cy + r], outline=blend(BG, green, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy), 350, green, 0.025)
 
     # Verse
+    ctx.phase("verse")
     verse = '"He shall cover thee with His feathers, and under His wings shalt thou trust;'
     verse2 = 'His truth shall be thy shield and buckler."'
     tw = draw.textlength(verse, font=font_verse)
@@ -2748,26 +3838,25 @@ def wallpaper_firewall_faith():
     tw = draw.textlength(ref, font=font_md)
     draw.text(((W - tw) // 2, H - 70), ref, fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/25-firewall-faith.png", "PNG", optimize=True)
-    print("Saved backgrounds/25-firewall-faith.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 26. The Hacker's Prayer — Lord's Prayer as code (Matt 6:9)
 # ─────────────────────────────────────────────────────────────
-def wallpaper_hackers_prayer():
+@register(26, "hackers-prayer", seed=609)
+def wallpaper_hackers_prayer(ctx):
     """The Lord's Prayer written as hacker pseudocode — Matt 6:9-13."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(609)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_code = get_font(26)
-    font_comment = get_font(20)
-    font_verse = get_font(32)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_code = ctx.font(26)
+    font_comment = ctx.font(20)
+    font_verse = ctx.font(32)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2778,13 +3867,11 @@ def wallpaper_hackers_prayer():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(4000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.015, 0.035)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 4000, MATRIX_CHARS, green, (0.015, 0.035), font_bg)
 
     # Code block — The Lord's Prayer as executable code
+    ctx.phase("code")
     code_lines = [
         ("#!/usr/bin/env prayer", dim, 0.40, font_comment),
         ("# The Lord's Prayer — Executable Faith", dim, 0.40, font_comment),
@@ -2827,7 +3914,7 @@ def wallpaper_hackers_prayer():
     line_h = 36
 
     # Faint editor line numbers
-    line_num_font = get_font(16)
+    line_num_font = ctx.font(16)
     for i, (text, color, alpha, font) in enumerate(code_lines):
         y = code_y + i * line_h
         # Line number
@@ -2840,6 +3927,7 @@ def wallpaper_hackers_prayer():
               fill=blend(BG, green, 0.15), width=1)
 
     # Matrix rain on sides
+    ctx.phase("rain")
     for col in range(0, W, 40):
         if code_x - 100 < col < code_x + 1200:
             continue
@@ -2854,6 +3942,7 @@ def wallpaper_hackers_prayer():
             draw.text((col, y), random.choice(MATRIX_CHARS), fill=color, font=font_sm)
 
     # Verse at bottom
+    ctx.phase("verse")
     verse = '"After this manner therefore pray ye..."'
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, H - 120), verse, fill=blend(BG, bright, 0.70), font=font_verse)
@@ -2861,25 +3950,24 @@ def wallpaper_hackers_prayer():
     tw = draw.textlength(ref, font=font_md)
     draw.text(((W - tw) // 2, H - 75), ref, fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.2))
-    img.save("backgrounds/26-hackers-prayer.png", "PNG", optimize=True)
-    print("Saved backgrounds/26-hackers-prayer.png")
+    img = ctx.blur(img, 0.2)
+    return img
 
 
 # ─────────────────────────────────────────────────────────────
 # 27. Digital Resurrection — Figure rising from data (1 Cor 15:55)
 # ─────────────────────────────────────────────────────────────
-def wallpaper_digital_resurrection():
+@register(27, "digital-resurrection", seed=1555)
+def wallpaper_digital_resurrection(ctx):
     """Figure rising/reassembling from fragmented glitch data — 1 Cor 15:55."""
-    img = Image.new("RGB", (W, H), BG)
-    draw = ImageDraw.Draw(img)
-    random.seed(1555)
+    W, H = ctx.W, ctx.H
+    img, draw = ctx.canvas()
 
-    font_bg = get_font(10)
-    font_sm = get_font(14)
-    font_md = get_font(22)
-    font_lg = get_font(30)
-    font_verse = get_font(34)
+    font_bg = ctx.font(10)
+    font_sm = ctx.font(14)
+    font_md = ctx.font(22)
+    font_lg = ctx.font(30)
+    font_verse = ctx.font(34)
 
     green = (0, 255, 65)
     bright = (180, 255, 210)
@@ -2889,13 +3977,11 @@ def wallpaper_digital_resurrection():
     cx, cy = W // 2, H // 2
 
     # Background scatter
-    for _ in range(4000):
-        x = random.randint(0, W)
-        y = random.randint(0, H)
-        a = random.uniform(0.02, 0.04)
-        draw.text((x, y), random.choice(MATRIX_CHARS), fill=blend(BG, green, a), font=font_bg)
+    ctx.phase("scatter")
+    scatter_glyphs(ctx, img, draw, 4000, MATRIX_CHARS, green, (0.02, 0.04), font_bg)
 
     # Broken / glitched data fragments at bottom (death/grave)
+    ctx.phase("fragments")
     for y in range(cy + 200, H - 100, 10):
         for x in range(cx - 500, cx + 500, 14):
             depth = (y - (cy + 200)) / (H - 100 - cy - 200)
@@ -2907,6 +3993,7 @@ def wallpaper_digital_resurrection():
                           fill=blend(BG, green, a), font=font_sm)
 
     # Rising figure — assembling from fragments
+    ctx.phase("fill")
     def in_rising_figure(px, py):
         nx = (px - cx) / 300
         ny = (py - cy) / 500
@@ -2971,6 +4058,7 @@ def wallpaper_digital_resurrection():
                                   fill=blend(BG, green, a), font=font_sm)
 
     # Data particles rising upward from the figure (resurrection energy)
+    ctx.phase("particles")
     for _ in range(500):
         x = cx + random.randint(-250, 250)
         y = random.randint(cy - 500, cy + 100)
@@ -2981,13 +4069,11 @@ def wallpaper_digital_resurrection():
         draw.text((x, y), random.choice(chars), fill=blend(BG, gold, a), font=size_pick)
 
     # Bright glow behind head/upper body
-    for r in range(500, 0, -4):
-        a = 0.03 * (1 - r / 500) ** 2
-        if a > 0.001:
-            draw.ellipse([cx - r, (cy - 280) - r, cx + r, (cy - 280) + r],
-                         outline=blend(BG, gold, a))
+    ctx.phase("glow")
+    ctx.glow(img, (cx, cy - 280), 500, gold, 0.03)
 
     # Glitch lines (horizontal scan artifacts)
+    ctx.phase("glitch")
     for _ in range(20):
         gy = random.randint(cy, cy + 350)
         gx = random.randint(cx - 200, cx + 100)
@@ -2996,6 +4082,7 @@ def wallpaper_digital_resurrection():
         draw.line([(gx, gy), (gx + gw, gy)], fill=blend(BG, green, a), width=1)
 
     # Verse
+    ctx.phase("verse")
     verse = '"O death, where is thy sting? O grave, where is thy victory?"'
     tw = draw.textlength(verse, font=font_verse)
     draw.text(((W - tw) // 2, H - 130), verse, fill=blend(BG, bright, 0.78), font=font_verse)
@@ -3003,40 +4090,1619 @@ def wallpaper_digital_resurrection():
     tw = draw.textlength(ref, font=font_md)
     draw.text(((W - tw) // 2, H - 80), ref, fill=blend(BG, green, 0.55), font=font_md)
 
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.3))
-    img.save("backgrounds/27-digital-resurrection.png", "PNG", optimize=True)
-    print("Saved backgrounds/27-digital-resurrection.png")
+    img = ctx.blur(img, 0.3)
+    return img
 
 
-if __name__ == "__main__":
-    wallpaper_matrix_rain()
-    wallpaper_circuit()
-    wallpaper_hexdump()
-    wallpaper_binary_rain()
-    wallpaper_cyber_grid()
-    wallpaper_terminal_scroll()
-    wallpaper_skull()
-    wallpaper_cross()
-    wallpaper_jesus()
-    wallpaper_crown_of_thorns()
-    wallpaper_ichthys()
-    wallpaper_praying_hands()
-    wallpaper_alice_time()
-    wallpaper_kingdom()
-    wallpaper_armor()
-    wallpaper_lamb()
-    wallpaper_alpha_omega()
-    wallpaper_burning_bush()
-    wallpaper_eye_of_providence()
-    wallpaper_lion_of_judah()
-    wallpaper_narrow_gate()
-    wallpaper_sword_of_spirit()
-    wallpaper_digital_genesis()
-    wallpaper_matrix_baptism()
-    wallpaper_firewall_faith()
-    wallpaper_hackers_prayer()
-    wallpaper_digital_resurrection()
-    print("Done! Generated 27 wallpapers.")
+# ─────────────────────────────────────────────────────────────
+# Live mode — animated rain streamed as raw frames
+# ─────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class LiveRain:
+    """How a rain wallpaper animates: its glyph grid, streams and look.
+
+    ``tier`` is the generator's own color/font function and ``backdrop``
+    its static background layer, so the animation matches the still.
+    ``streams`` is the range of streams per column and ``speed`` the range
+    of fall speeds in cells per second.
+    """
+
+    chars: str
+    cell: tuple
+    tier: Callable
+    backdrop: Callable
+    lengths: tuple
+    streams: tuple
+    speed: tuple = (8.0, 24.0)
+    fade_steps: int = 4
+    mutate: float = 0.5
+
+
+LIVE = {
+    "matrix-rain": LiveRain("".join(MATRIX_CHARS), (34, 36), matrix_rain_tier,
+                            matrix_rain_backdrop, lengths=(15, 50), streams=(1, 2)),
+    "binary-rain": LiveRain("01", (22, 36), binary_rain_tier, binary_rain_backdrop,
+                            lengths=(20, 65), streams=(0, 2), speed=(10.0, 30.0)),
+}
+
+
+class RainAnimation:
+    """Falling streams on a fixed glyph grid, redrawn cell by cell.
+
+    Every frame each stream's head advances by its speed; the trail above
+    it takes its color from the wallpaper's tier function, with fades
+    snapped to ``fade_steps`` levels.  The whole screen state is two small
+    grids (palette level and glyph per cell), so a frame is a diff of those
+    grids and a single gather of pre-rendered cell sprites over the static
+    backdrop — only cells whose glyph or level changed are touched.
+    """
+
+    def __init__(self, wp, size, fps):
+        spec = LIVE[wp.slug]
+        self.fps = fps
+        self.width, self.height = size
+        random.seed(wp.seed)
+        ctx = RenderContext(*size)
+        self.rng = np.random.default_rng(wp.seed)
+        self.spec = spec
+
+        cw, ch = (max(1, round(v * ctx.scale)) for v in spec.cell)
+        self.cols = -(-self.width // cw)
+        self.rows = -(-self.height // ch)
+
+        # Static layer, padded out to whole cells.
+        img, draw = ctx.canvas()
+        spec.backdrop(ctx, img, draw)
+        back = np.zeros((self.rows * ch, self.cols * cw, 3), np.uint8)
+        back[...] = BG
+        back[:self.height, :self.width] = np.asarray(img)
+        self.back = back.reshape(self.rows, ch, self.cols, cw, 3)
+        self.frame = self.back.copy()
+        self.buffer = self.frame.reshape(self.rows * ch, self.cols * cw, 3)
+
+        # Palette of (color, font size), dimmest first; 0 is an empty cell.
+        lo, hi = spec.lengths
+        looks = {(n, i): spec.tier(i, n, spec.fade_steps)
+                 for n in range(lo, hi + 1) for i in range(n)}
+        palette = sorted(set(looks.values()), key=lambda look: (sum(look[0]), look[1]))
+        index = {look: k + 1 for k, look in enumerate(palette)}
+        self.levels = np.zeros((hi + 1, hi), np.int16)
+        for (n, i), look in looks.items():
+            self.levels[n, i] = index[look]
+        self.sprites = self._sprites(ctx, palette, (ch, cw))
+
+        # Streams: column, head row (fractional), length and speed.
+        per_col = self.rng.integers(spec.streams[0], spec.streams[1] + 1, self.cols)
+        self.col = np.repeat(np.arange(self.cols), per_col)
+        count = len(self.col)
+        self.length = self.rng.integers(lo, hi + 1, count)
+        self.head = self.rng.uniform(-self.rows, self.rows + hi, count)
+        self.speed = self.rng.uniform(*spec.speed, count) / fps
+        self.glyphs = self.rng.integers(0, len(spec.chars), (self.rows, self.cols))
+        self.shown = np.zeros((self.rows, self.cols), np.int16)
+        self.shown_glyphs = self.glyphs.copy()
+        self.offsets = np.arange(hi)
+
+    def _sprites(self, ctx, palette, cell):
+        """Each glyph in each palette look, blended over ``BG`` like ``draw.text``."""
+        ch, cw = cell
+        chars = self.spec.chars
+        sizes = sorted({size for _, size in palette})
+        masks = {}
+        for size in sizes:
+            font = ctx.font(size)
+            stack = np.zeros((len(chars), ch, cw), np.uint32)
+            for g, char in enumerate(chars):
+                tile = Image.new("L", (cw, ch))
+                ImageDraw.Draw(tile).text((0, 0), char, fill=255, font=font)
+                stack[g] = np.asarray(tile)
+            masks[size] = stack
+        bg = np.array(BG, np.uint32)
+        sprites = np.zeros((len(palette) + 1, len(chars), ch, cw, 3), np.uint8)
+        for k, (color, size) in enumerate(palette, 1):
+            m = masks[size][..., None]
+            t = bg * (255 - m) + np.array(color, np.uint32) * m + 128
+            sprites[k] = ((t >> 8) + t) >> 8
+        return sprites
+
+    def _respawn(self, done):
+        n = int(done.sum())
+        lo, hi = self.spec.lengths
+        self.length[done] = self.rng.integers(lo, hi + 1, n)
+        self.head[done] = -self.rng.uniform(0, self.rows / 2, n)
+        self.speed[done] = self.rng.uniform(*self.spec.speed, n) / self.fps
+
+    def step(self):
+        """Advance one frame and redraw the cells that changed; returns their count."""
+        self.head += self.speed
+        done = self.head - self.length >= self.rows
+        if done.any():
+            self._respawn(done)
+
+        # Glyphs flicker: a few cells swap characters every frame.
+        cells = self.rows * self.cols
+        n = self.rng.poisson(self.spec.mutate * len(self.col))
+        self.glyphs.flat[self.rng.integers(0, cells, n)] = \
+            self.rng.integers(0, len(self.spec.chars), n)
+
+        # Desired level of every cell; overlapping streams keep the brightest.
+        rows = np.floor(self.head).astype(np.intp)[:, None] - self.offsets
+        visible = (self.offsets < self.length[:, None]) & (rows >= 0) & (rows < self.rows)
+        level = self.levels[self.length[:, None], self.offsets]
+        cols = np.broadcast_to(self.col[:, None], rows.shape)
+        want = np.zeros_like(self.shown)
+        np.maximum.at(want, (rows[visible], cols[visible]), level[visible])
+
+        changed = (want != self.shown) | ((self.glyphs != self.shown_glyphs) & (want > 0))
+        r, c = np.nonzero(changed)
+        if len(r):
+            self.frame[r, :, c] = np.maximum(self.back[r, :, c],
+                                             self.sprites[want[r, c], self.glyphs[r, c]])
+            self.shown[r, c] = want[r, c]
+            self.shown_glyphs[r, c] = self.glyphs[r, c]
+        return len(r)
+
+    def pixels(self):
+        """The current frame as contiguous ``height x width`` RGB24 rows."""
+        view = self.buffer[:self.height, :self.width]
+        return view if view.flags.c_contiguous else np.ascontiguousarray(view)
+
+
+def live(wp, size, fps, frames=None, output="-"):
+    """Stream ``wp``'s animation as raw RGB24 frames to ``output``.
+
+    ``output`` is ``-`` for stdout or a path such as a FIFO a wallpaper
+    player reads from (e.g. ``ffplay -f rawvideo -pixel_format rgb24
+    -video_size WxH -framerate FPS -``).  Frames are paced to ``fps``; a
+    late frame is sent at once rather than dropped.  Stops after ``frames``
+    frames, or when the reader goes away.  Returns per-frame update times.
+    """
+    anim = RainAnimation(wp, size, fps)
+    out = sys.stdout.buffer if output == "-" else open(output, "wb")
+    interval = 1 / fps
+    times = []
+    deadline = time.perf_counter()
+    try:
+        while frames is None or len(times) < frames:
+            start = time.perf_counter()
+            anim.step()
+            frame = anim.pixels()
+            times.append(time.perf_counter() - start)
+            out.write(frame.data)
+            out.flush()
+            deadline += interval
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()
+    except BrokenPipeError:
+        # Keep the interpreter from complaining about the closed stdout on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), out.fileno())
+    finally:
+        if output != "-":
+            out.close()
+    return times
+
+
+# ─────────────────────────────────────────────────────────────
+# Output pipeline — render once, encode every display size
+# ─────────────────────────────────────────────────────────────
+def variant_dir(size):
+    """Subdirectory of the output directory that holds one variant size."""
+    return "%dx%d" % tuple(size)
+
+
+def output_file(wp, size):
+    """Output path, relative to the output directory, of ``wp`` rendered at ``size``.
+
+    Only the design size goes to the top level, next to the shipped
+    wallpapers; any other size goes to its ``variant_dir``.
+    """
+    if tuple(size) == (W, H):
+        return wp.filename
+    return os.path.join(variant_dir(size), wp.filename)
+
+
+def _resample(img, size):
+    """High-quality downsample of ``img`` to ``size``.
+
+    A differing aspect ratio is center-cropped rather than stretched.
+    ``reducing_gap`` lets PIL box-reduce by an integer factor first, which
+    keeps the Lanczos pass cheap for thumbnails.
+    """
+    if img.size == tuple(size):
+        return img
+    width, height = img.size
+    crop_w = min(width, height * size[0] / size[1])
+    crop_h = min(height, width * size[1] / size[0])
+    left, top = (width - crop_w) / 2, (height - crop_h) / 2
+    return img.resize(size, Image.LANCZOS, box=(left, top, left + crop_w, top + crop_h),
+                      reducing_gap=3.0)
+
+
+@dataclass(frozen=True)
+class Encoder:
+    """How output files are written: PIL format, save options and extension.
+
+    ``optimizers`` lists external lossless PNG optimizers to try, in order of
+    preference; the first one found on ``PATH`` is run over each file after
+    PIL writes it.  ``writer``, if set, turns an image into the file's bytes
+    in place of PIL's encoder.
+    """
+
+    name: str
+    format: str
+    ext: str
+    options: tuple = ()
+    optimizers: tuple = ()
+    writer: object = None
+
+    def optimizer(self):
+        """The optimizer command line to run, or None if none is installed."""
+        for argv in self.optimizers:
+            if shutil.which(argv[0]):
+                return argv
+        return None
+
+    def save(self, img, path):
+        """Write ``img`` to ``path`` in this profile's format (no optimizer pass)."""
+        if self.writer is None:
+            img.save(path, self.format, **dict(self.options))
+            return
+        with open(path, "wb") as f:
+            f.write(self.writer(img))
+
+
+def encode_qoi(img):
+    """The QOI file of an RGB image, encoded with NumPy over all pixels at once.
+
+    Pillow's QOI encoder walks the image in Python, seconds per 4K frame.
+    Every QOI op depends only on the pixel, the one before it and the last
+    pixel with the same hash, so all three are worked out as arrays: runs
+    from equal neighbours, index hits from a stable sort by hash, and the
+    DIFF/LUMA/RGB choice from the wrapped channel deltas.  The chunks are
+    the reference encoder's; the header marks the image as sRGB.
+    """
+    width, height = img.size
+    # One uint32 per pixel; alpha is always 255, as QOI's start pixel has it.
+    v = np.frombuffer(img.convert("RGBA").tobytes(), np.uint32)
+    prev = np.empty_like(v)
+    prev[0] = np.frombuffer(bytes([0, 0, 0, 255]), np.uint32)[0]
+    prev[1:] = v[:-1]
+    run = v == prev
+
+    # Each run of equal pixels emits a byte every 62 pixels and at its end,
+    # holding the length covered by that byte.
+    edges = np.flatnonzero(np.diff(run, prepend=False, append=False))
+    starts, ends = edges[::2], edges[1::2]
+    count = (ends - starts + 61) // 62
+    seg = np.repeat(np.arange(len(starts)), count)
+    first = starts[seg] + 62 * (np.arange(len(seg)) - np.repeat(np.cumsum(count) - count, count))
+    run_at = np.minimum(first + 61, ends[seg] - 1)
+    run_ops = 0xC0 | (run_at - first)
+
+    # Everything else is coded on its own: an index hit when the last
+    # other pixel with the same hash is this one, else against the pixel
+    # before as DIFF, LUMA or a full RGB.
+    other = np.flatnonzero(~run)
+    cur, before = v[other], prev[other]
+    rgb, rgb_before = (np.stack([p & 255, p >> 8 & 255, p >> 16 & 255], axis=1).astype(np.int16)
+                       for p in (cur, before))
+    hashes = (rgb[:, 0] * 3 + rgb[:, 1] * 5 + rgb[:, 2] * 7 + 255 * 11) % 64
+    order = np.argsort(hashes, kind="stable")
+    hit = np.zeros(len(other), bool)
+    later, earlier = order[1:], order[:-1]
+    hit[later] = (hashes[later] == hashes[earlier]) & (cur[later] == cur[earlier])
+    d = (rgb - rgb_before + 128) % 256 - 128
+    dr, dg, db = d[:, 0], d[:, 1], d[:, 2]
+    rg, bg = dr - dg, db - dg
+    diff = ~hit & (d.min(axis=1) >= -2) & (d.max(axis=1) <= 1)
+    luma = (~hit & ~diff & (dg >= -32) & (dg <= 31)
+            & (rg >= -8) & (rg <= 7) & (bg >= -8) & (bg <= 7))
+    full = ~hit & ~diff & ~luma
+
+    # Byte offsets: the run bytes and other pixels' ops before each one.
+    sizes = 1 + luma + 3 * full
+    done = np.cumsum(sizes) - sizes
+    at = done + np.searchsorted(run_at, other)
+    run_at = np.arange(len(run_at)) + np.concatenate([[0], np.cumsum(sizes)])[
+        np.searchsorted(other, run_at)]
+
+    out = np.empty(len(run_at) + int(sizes.sum()), np.uint8)
+    out[run_at] = run_ops
+    out[at[hit]] = hashes[hit]
+    out[at[diff]] = 0x40 | (dr[diff] + 2) << 4 | (dg[diff] + 2) << 2 | (db[diff] + 2)
+    out[at[luma]] = 0x80 | (dg[luma] + 32)
+    out[at[luma] + 1] = (rg[luma] + 8) << 4 | (bg[luma] + 8)
+    out[at[full]] = 0xFE
+    for c in range(3):
+        out[at[full] + 1 + c] = rgb[full, c]
+    header = b"qoif" + struct.pack(">IIBB", width, height, 3, 0)
+    return header + out.tobytes() + b"\0" * 7 + b"\1"
+
+
+ENCODERS = {
+    # zlib level 1, no filter search: for iterating on a generator.
+    "fast": Encoder("fast", "PNG", ".png", (("compress_level", 1),)),
+    # PIL's optimize pass; what backgrounds/ has always been written with.
+    "default": Encoder("default", "PNG", ".png", (("optimize", True),)),
+    # Max zlib plus an external optimizer pass, for the shipped set.
+    "release": Encoder("release", "PNG", ".png", (("optimize", True),), optimizers=(
+        ("oxipng", "-q", "-o", "4", "--strip", "safe"),
+        ("optipng", "-quiet", "-o2"),
+    )),
+    # Lossless; quality/method 50/2 is within a few % of the smallest file
+    # at a fifth of the encode time.
+    "webp": Encoder("webp", "WEBP", ".webp", (("lossless", True), ("quality", 50), ("method", 2))),
+    # Pillow's QOI codec is pure Python and slow; encode_qoi is NumPy.
+    "qoi": Encoder("qoi", "QOI", ".qoi", writer=encode_qoi),
+}
+
+
+def export(img, filename, out_dir, variants=(), encoder=ENCODERS["default"]):
+    """Encode ``img`` and each of its ``variants`` sizes concurrently.
+
+    Every variant is resampled from the one in-memory render; PIL releases
+    the GIL while resizing and compressing, and optimizers run as separate
+    processes, so the encoders run in parallel threads.  ``filename`` gets
+    the encoder's extension.  Returns ``{relative path: (sha256, bytes,
+    encode seconds)}`` for every file written.  Variants go to their
+    ``variant_dir`` whatever subdirectory ``filename`` is in.
+    """
+    filename = os.path.splitext(filename)[0] + encoder.ext
+    jobs = [(filename, img.size)]
+    jobs += [(os.path.join(variant_dir(size), os.path.basename(filename)), size)
+             for size in variants]
+    optimizer = encoder.optimizer()
+
+    def encode(job):
+        relpath, size = job
+        path = os.path.join(out_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        frame = _resample(img, size)
+        start = time.perf_counter()
+        encoder.save(frame, path)
+        if optimizer:
+            subprocess.run([*optimizer, path], check=True)
+        elapsed = time.perf_counter() - start
+        return relpath, (_file_digest(path), os.path.getsize(path), elapsed)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        return dict(pool.map(encode, jobs))
+
+
+class PNGStream:
+    """Write an RGB PNG row band by row band, holding none of the rest.
+
+    Each row gets the PNG filter (none, sub, up, average or Paeth) whose
+    output has the smallest sum of absolute values, the same heuristic as
+    libpng, computed with NumPy a few rows at a time; the filtered bytes go
+    straight into a zlib stream emitted as IDAT chunks.
+    """
+
+    ROWS = 32  # rows filtered per NumPy batch
+
+    def __init__(self, f, size, level=6):
+        self.f = f
+        self.width, self.height = size
+        self.rows = 0
+        self.z = zlib.compressobj(level)
+        self.prev = np.zeros(self.width * 3, np.uint8)
+        f.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, kind, data):
+        self.f.write(struct.pack(">I", len(data)) + kind + data)
+        self.f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    @staticmethod
+    def _cost(rows):
+        # Sum of |byte| read as signed, per row: min(b, 256 - b) in uint8.
+        return np.minimum(rows, -rows).sum(axis=1, dtype=np.uint32)
+
+    def _filter(self, raw):
+        up = np.vstack([self.prev[None], raw[:-1]])
+        left = np.zeros_like(raw)
+        left[:, 3:] = raw[:, :-3]
+        upleft = np.zeros_like(raw)
+        upleft[:, 3:] = up[:, :-3]
+        # uint8 arithmetic wraps modulo 256, exactly as PNG filters do.
+        a, b, c = (v.astype(np.int16) for v in (left, up, upleft))
+        pa, pb, pc = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+        paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upleft))
+        average = (left >> 1) + (up >> 1) + (left & up & 1)
+        filtered = [raw, raw - left, raw - up, raw - average, raw - paeth]
+        best = np.argmin([self._cost(f) for f in filtered], axis=0)
+        out = np.empty((len(raw), raw.shape[1] + 1), np.uint8)
+        out[:, 0] = best
+        for kind, f in enumerate(filtered):
+            rows = best == kind
+            out[rows, 1:] = f[rows]
+        self.prev = raw[-1]
+        return out.tobytes()
+
+    def write(self, img):
+        """Append the rows of ``img``, an RGB image as wide as the PNG."""
+        pixels = np.asarray(img, dtype=np.uint8).reshape(img.height, self.width * 3)
+        for start in range(0, len(pixels), self.ROWS):
+            data = self.z.compress(self._filter(pixels[start:start + self.ROWS]))
+            if data:
+                self._chunk(b"IDAT", data)
+        self.rows += img.height
+
+    def close(self):
+        if self.rows != self.height:
+            raise ValueError(f"wrote {self.rows} of {self.height} rows")
+        self._chunk(b"IDAT", self.z.flush())
+        self._chunk(b"IEND", b"")
+
+
+def export_tiled(canvas, filename, out_dir, rows, encoder=ENCODERS["default"], box=None):
+    """Render the ``DrawList`` ``canvas`` in strips of ``rows`` rows into one PNG.
+
+    Each strip is encoded as soon as it is drawn, so memory is bounded by
+    the strip, not the frame.  The zlib level follows the encoder profile
+    (``optimize`` means 9, like PIL); its optimizer, if any, runs on the
+    finished file.  ``box`` limits the PNG to that part of the frame.
+    Returns the same mapping as ``export``.
+    """
+    if encoder.format != "PNG":
+        raise ValueError(f"tiled output is PNG only, not {encoder.name}")
+    options = dict(encoder.options)
+    level = options.get("compress_level", 9 if options.get("optimize") else 6)
+    optimizer = encoder.optimizer()
+    path = os.path.join(out_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    box = box or (0, 0, *canvas.size)
+    start = time.perf_counter()
+    with open(path, "wb") as f:
+        png = PNGStream(f, (box[2] - box[0], box[3] - box[1]), level)
+        for strip in canvas.strips(rows, box):
+            png.write(strip)
+        png.close()
+    if optimizer:
+        subprocess.run([*optimizer, path], check=True)
+    elapsed = time.perf_counter() - start
+    return {filename: (_file_digest(path), os.path.getsize(path), elapsed)}
+
+
+def parse_sizes(text):
+    """Parse a comma-separated list of ``WIDTHxHEIGHT`` sizes."""
+    return [parse_size(part) for part in text.split(",") if part.strip()]
+
+
+def parse_option(text):
+    """Parse ``NAME=VALUE`` into a pair; the value is a Python literal (``nodes=12000``)."""
+    name, sep, value = text.partition("=")
+    if not sep or not name.isidentifier():
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    try:
+        return name, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        raise argparse.ArgumentTypeError(f"{name}: expected a number or literal, got {value!r}")
+
+
+# ─────────────────────────────────────────────────────────────
+# Monitor spans — one canvas sliced across several displays
+# ─────────────────────────────────────────────────────────────
+SPAN_DIR = "span"
 
 
+@dataclass(frozen=True)
+class Monitor:
+    """One display of a span: its size and its offset on the desktop."""
 
+    width: int
+    height: int
+    x: int
+    y: int
+
+    @property
+    def box(self):
+        return self.x, self.y, self.x + self.width, self.y + self.height
+
+
+def parse_layout(text):
+    """Parse ``WxH[+X+Y],...`` (xrandr geometry) into a list of monitors.
+
+    A monitor without an offset sits right of the previous one, top-aligned,
+    so ``3840x2160,3840x2160,3840x2160`` is three 4K panels side by side.
+    """
+    monitors = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        size, _, offset = part.partition("+")
+        width, height = parse_size(size)
+        if offset:
+            try:
+                x, y = (int(v) for v in offset.split("+"))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"expected WxH+X+Y, got {part!r}")
+        else:
+            x = monitors[-1].box[2] if monitors else 0
+            y = monitors[-1].y if monitors else 0
+        monitors.append(Monitor(width, height, x, y))
+    if not monitors:
+        raise argparse.ArgumentTypeError("empty monitor layout")
+    return monitors
+
+
+def with_bezels(monitors, bezel):
+    """Move monitors apart by ``bezel`` pixels per column or row edge before them.
+
+    The hidden pixels behind the bezels are part of the canvas but never
+    written, so a line crossing two panels stays straight.  The layout is
+    also shifted so its top-left corner is (0, 0).  Monitors sharing a
+    column edge count it once, so a 2x2 grid gets a single bezel gap.
+    """
+    x0 = min(m.x for m in monitors)
+    y0 = min(m.y for m in monitors)
+    moved = []
+    for m in monitors:
+        left = len({o.box[2] for o in monitors if o.box[2] <= m.x})
+        above = len({o.box[3] for o in monitors if o.box[3] <= m.y})
+        moved.append(Monitor(m.width, m.height,
+                             m.x - x0 + left * bezel, m.y - y0 + above * bezel))
+    return moved
+
+
+def span_size(monitors):
+    """Size of the canvas that covers every monitor of a normalized layout."""
+    return max(m.box[2] for m in monitors), max(m.box[3] for m in monitors)
+
+
+def span_file(wp, index):
+    """Output path, relative to the output directory, of monitor ``index``'s slice."""
+    stem, ext = os.path.splitext(wp.filename)
+    return os.path.join(SPAN_DIR, f"{stem}-{index + 1}{ext}")
+
+
+# ─────────────────────────────────────────────────────────────
+# Build cache — skip wallpapers whose inputs have not changed
+# ─────────────────────────────────────────────────────────────
+MANIFEST = ".manifest.json"
+GLYPH_CACHE = ".glyphs.json"
+MANIFEST_VERSION = 2
+
+
+def _dependencies(*funcs):
+    """Module-level functions and classes ``funcs`` use, transitively.
+
+    Walks the names referenced by the generator (and its nested helpers such
+    as ``in_skull``) so that editing a shared helper like ``blend`` also
+    invalidates every wallpaper that calls it.
+    """
+    found = {}
+    stack = [func.__code__ for func in funcs]
+    while stack:
+        code = stack.pop()
+        stack.extend(c for c in code.co_consts if inspect.iscode(c))
+        for name in code.co_names:
+            obj = globals().get(name)
+            if name in found or getattr(obj, "__module__", None) != __name__:
+                continue
+            if inspect.isfunction(obj):
+                found[name] = obj
+                stack.append(obj.__code__)
+            elif inspect.isclass(obj):
+                found[name] = obj
+                stack.extend(m.__code__ for m in vars(obj).values() if inspect.isfunction(m))
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def _module_sources():
+    """Source text of every top-level function and class, parsed once.
+
+    ``inspect.getsource`` re-parses the whole module for each class it is
+    asked about, which made fingerprinting cost seconds per wallpaper.
+    """
+    with open(__file__, encoding="utf-8") as f:
+        text = f.read()
+    lines = text.splitlines(keepends=True)
+    sources = {}
+    for node in ast.parse(text).body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            sources[node.name] = "".join(lines[start - 1:node.end_lineno])
+    return sources
+
+
+def _source(obj):
+    """Source of a module-level function or class, from ``_module_sources``."""
+    source = _module_sources().get(obj.__name__)
+    return source if source is not None else inspect.getsource(obj)
+
+
+@functools.lru_cache(maxsize=None)
+def _font_digest():
+    path = resolve_font_path()
+    if path is None:
+        return "pil-default"
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def fingerprint(wp, size=(W, H), variants=(), exact=True, encoder=ENCODERS["default"],
+                tile=None, span=()):
+    """Hash everything that determines the files of ``wp`` at ``size``.
+
+    That is the generator source, its seed and options, the resolution and variant sizes,
+    the scatter mode, the encoder profile and the optimizer it found, the
+    strip height of a tiled build, the monitor layout of a span (whose
+    canvas size is ``size``), the palette, the resolved font file and
+    the source of every module helper it calls, including the render context
+    it draws through.
+    """
+    h = hashlib.sha256()
+    parts = [
+        _source(wp.func),
+        repr(wp.seed),
+        repr(wp.options),
+        repr(tuple(size)),
+        repr([tuple(v) for v in variants]),
+        repr(exact),
+        repr((encoder, encoder.optimizer())),
+        repr(tile),
+        repr(list(span)),
+        repr((BG, MATRIX_CHARS, HEX)),
+        _font_digest(),
+    ]
+    for name, obj in sorted(_dependencies(wp.func, Wallpaper.render, export,
+                                          export_tiled).items()):
+        parts.append(_source(obj))
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("wallpapers", {})
+
+
+def save_manifest(out_dir, entries):
+    path = os.path.join(out_dir, MANIFEST)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "wallpapers": entries}, f,
+                  indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def is_up_to_date(entry, fp, out_dir):
+    """True if ``entry`` was built from fingerprint ``fp`` and is untouched."""
+    if not entry or entry.get("fingerprint") != fp:
+        return False
+    try:
+        return all(_file_digest(os.path.join(out_dir, relpath)) == digest
+                   for relpath, digest in entry["files"].items())
+    except (OSError, KeyError):
+        return False
+
+
+# ─────────────────────────────────────────────────────────────
+# Build driver — run the generators across a process pool
+# ─────────────────────────────────────────────────────────────
+def _run_generator(task):
+    """Render and save one wallpaper in a pool worker and measure it.
+
+    Every wallpaper is seeded from the registry before it runs, so the output
+    does not depend on which worker runs it or in which order.  Workers are
+    recycled after each task so ``ru_maxrss`` is the peak RSS of that
+    wallpaper alone (KiB on Linux).  With ``tile`` rows the render is
+    recorded and drawn and encoded strip by strip, so "save" includes the
+    drawing.  A ``part`` of a span is ``(monitor index, box)``: the render
+    is recorded and only that monitor's box of it drawn and saved.  With
+    ``threads`` above one the render is recorded and drawn in that many
+    bands at once (see ``DrawList.render``); "save" includes the drawing
+    then as well.  Glyph masks rasterized by earlier renders into
+    ``out_dir`` are reused, and new ones added for later renders (see
+    ``GlyphAtlas.save``).
+    """
+    slug, options, out_dir, size, variants, exact, encoder, trace_dir, tile, part, threads = task
+    wp = replace(find_wallpaper(slug), options=options)
+    trace = PhaseTrace() if trace_dir else None
+    glyphs = os.path.join(out_dir, GLYPH_CACHE)
+    GLYPHS.load(glyphs)
+    start = time.perf_counter()
+    img = wp.render(size, exact, trace, record=bool(tile or part or threads > 1))
+    saving = time.perf_counter()
+    filename, box = output_file(wp, size), None
+    if part is not None:
+        index, box = part
+        filename = span_file(wp, index)
+    if tile:
+        written = export_tiled(img, filename, out_dir, tile, encoder, box)
+    elif box or threads > 1:
+        written = export(img.render(threads, box), filename, out_dir, variants, encoder)
+    else:
+        written = export(img, filename, out_dir, variants, encoder)
+    wall = time.perf_counter() - start
+    GLYPHS.save(glyphs)
+    if trace is not None:
+        trace.add("save", time.perf_counter() - saving)
+        write_trace(trace, trace_dir, wp, size)
+    for relpath in written:
+        print(f"Saved {os.path.join(out_dir, relpath)}", flush=True)
+    fonts = font_cache_info()
+    stats = {
+        "wall": wall,
+        "peak_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "font_hits": fonts.hits,
+        "font_misses": fonts.misses,
+        "files": {relpath: (size, secs) for relpath, (_, size, secs) in written.items()},
+    }
+    files = {relpath: digest for relpath, (digest, _, _) in written.items()}
+    return slug, stats, files
+
+
+def _merge_stats(a, b):
+    """Combine the stats of two parts of one wallpaper rendered side by side."""
+    return {
+        "wall": max(a["wall"], b["wall"]),
+        "peak_kib": max(a["peak_kib"], b["peak_kib"]),
+        "font_hits": a["font_hits"] + b["font_hits"],
+        "font_misses": a["font_misses"] + b["font_misses"],
+        "files": {**a["files"], **b["files"]},
+    }
+
+
+def build(wallpapers, jobs, out_dir=BACKGROUNDS, force=False, size=(W, H), variants=(),
+          exact=True, encoder=ENCODERS["default"], trace_dir=None, tile=None, span=(),
+          threads=1):
+    """Generate the stale ``wallpapers`` on ``jobs`` worker processes.
+
+    Returns report rows for the wallpapers that were built and the list of
+    wallpapers skipped because the manifest shows them up to date.  With a
+    ``trace_dir`` every wallpaper is rebuilt and its phase trace written
+    there (see ``write_trace``).  ``tile`` renders in strips of that many
+    rows (see ``export_tiled``).  A ``span`` of monitors (see
+    ``with_bezels``) renders each wallpaper once across all of them and
+    writes one file per monitor under ``span/``, every monitor in its own
+    task; ``size`` is then ignored.  ``threads`` draws each render in that
+    many horizontal bands concurrently, for the same pixels.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    if span:
+        size = span_size(span)
+    fingerprints = {wp.slug: fingerprint(wp, size, variants, exact, encoder, tile, span)
+                    for wp in wallpapers}
+    key = {wp.slug: os.path.join(SPAN_DIR, wp.filename) if span else output_file(wp, size)
+           for wp in wallpapers}
+    stale, fresh = [], []
+    for wp in wallpapers:
+        if not (force or trace_dir) and is_up_to_date(manifest.get(key[wp.slug]), fingerprints[wp.slug], out_dir):
+            fresh.append(wp)
+        else:
+            stale.append(wp)
+    if not stale:
+        return [], fresh
+
+    parts = list(enumerate(m.box for m in span)) or [None]
+    tasks = [(wp.slug, wp.options, out_dir, size, variants, exact, encoder, trace_dir, tile,
+              part, threads) for wp in stale for part in parts]
+    results, written, pending = {}, {}, {wp.slug: len(parts) for wp in stale}
+    with multiprocessing.Pool(processes=min(jobs, len(tasks)), maxtasksperchild=1) as pool:
+        for slug, stats, files in pool.imap_unordered(_run_generator, tasks):
+            results[slug] = _merge_stats(results[slug], stats) if slug in results else stats
+            written.setdefault(slug, {}).update(files)
+            pending[slug] -= 1
+            if pending[slug]:
+                continue
+            manifest[key[slug]] = {"fingerprint": fingerprints[slug], "files": written[slug]}
+            save_manifest(out_dir, manifest)
+    if trace_dir:
+        merge_traces(trace_dir, stale)
+    return [(wp.name, results[wp.slug]) for wp in stale], fresh
+
+
+def write_trace(trace, trace_dir, wp, size):
+    """Write ``wp``'s phase breakdown as JSON and as folded stacks."""
+    os.makedirs(trace_dir, exist_ok=True)
+    stem = os.path.join(trace_dir, wp.slug)
+    with open(stem + ".json", "w") as f:
+        json.dump({
+            "wallpaper": wp.slug,
+            "size": list(size),
+            "seconds": sum(ph["seconds"] for ph in trace.phases),
+            "phases": trace.phases,
+            "summary": trace.summary(),
+        }, f, indent=2)
+        f.write("\n")
+    with open(stem + ".folded", "w") as f:
+        f.writelines(line + "\n" for line in trace.folded(wp.name))
+
+
+def merge_traces(trace_dir, wallpapers):
+    """Concatenate per-wallpaper folded stacks into ``trace_dir/trace.folded``.
+
+    The result feeds straight into ``flamegraph.pl`` (or speedscope) with
+    one tower per wallpaper and one block per phase.
+    """
+    with open(os.path.join(trace_dir, "trace.folded"), "w") as out:
+        for wp in wallpapers:
+            with open(os.path.join(trace_dir, wp.slug + ".folded")) as f:
+                out.write(f.read())
+
+
+def print_report(rows, elapsed):
+    """Print per-wallpaper wall time, peak RSS and font cache hits/misses."""
+    width = max(len(name) for name, _ in rows)
+    print()
+    print(f"{'wallpaper':<{width}}  {'wall':>8}  {'peak RSS':>10}  {'fonts hit/miss':>14}")
+    for name, st in rows:
+        fonts = f"{st['font_hits']}/{st['font_misses']}"
+        print(f"{name:<{width}}  {st['wall']:>7.2f}s  {st['peak_kib'] / 1024:>7.1f} MiB  {fonts:>14}")
+    total = sum(st["wall"] for _, st in rows)
+    hits = sum(st["font_hits"] for _, st in rows)
+    misses = sum(st["font_misses"] for _, st in rows)
+    fonts = f"{hits}/{misses}"
+    print(f"{'total':<{width}}  {total:>7.2f}s  {'':>10}  {fonts:>14}")
+    print(f"elapsed {elapsed:.2f}s")
+
+
+def print_files(rows, encoder):
+    """Print the size and encode time of every file written, per encoder profile."""
+    files = sorted(item for _, st in rows for item in st["files"].items())
+    width = max(len(relpath) for relpath, _ in files)
+    optimizer = encoder.optimizer()
+    print()
+    print(f"encoder {encoder.name}" + (f" + {optimizer[0]}" if optimizer else ""))
+    print(f"{'file':<{width}}  {'size':>10}  {'encode':>8}")
+    for relpath, (size, secs) in files:
+        print(f"{relpath:<{width}}  {size / 2**20:>6.2f} MiB  {secs:>7.2f}s")
+    size = sum(size for _, (size, _) in files)
+    secs = sum(secs for _, (_, secs) in files)
+    print(f"{'total':<{width}}  {size / 2**20:>6.2f} MiB  {secs:>7.2f}s")
+
+
+# ─────────────────────────────────────────────────────────────
+# Palettes — rendered wallpapers recolored from a colors.toml
+# ─────────────────────────────────────────────────────────────
+# Palette role -> colors.toml key it is read from.
+PALETTE_KEYS = {
+    "background": "background",
+    "accent": "accent",
+    "highlight": "color15",
+    "alert": "color1",
+}
+
+
+@dataclass(frozen=True)
+class Palette:
+    """The colors of the palette roles; the defaults are the stock theme in colors.toml.
+
+    The shipped renders are drawn for that theme: its background and accent
+    exactly, its highlight and alert as the nearby tints (180, 255, 210) and
+    (255, 50, 50), like most other colors in them.  A new palette is one
+    affine change of basis per pixel taking the stock role colors to the
+    new ones, which carries blends of them along.  It is approximate:
+    tints land near rather than on the new roles, and neither the 8-bit
+    rounding of ``blend`` nor the saturating adds of glows is undone.  The
+    stock palette itself maps to the identity and changes nothing.
+    """
+
+    name: str = "spectre"
+    background: tuple = BG
+    accent: tuple = (0, 255, 65)
+    highlight: tuple = (187, 255, 187)
+    alert: tuple = (255, 0, 51)
+
+    def matrix(self):
+        """The 3x4 ``Image.convert`` matrix taking the stock palette to this one."""
+        base = Palette()
+        roles = ("accent", "highlight", "alert")
+        # Columns are the role colors relative to their background.
+        src = np.array([getattr(base, r) for r in roles], np.float64) - base.background
+        dst = np.array([getattr(self, r) for r in roles], np.float64) - self.background
+        a = dst.T @ np.linalg.inv(src.T)
+        offset = np.array(self.background) - a @ np.array(base.background)
+        return tuple(np.column_stack([a, offset]).ravel().tolist())
+
+
+def _hex_color(text):
+    """``"#RRGGBB"`` as an ``(r, g, b)`` tuple."""
+    value = text.lstrip("#")
+    if len(value) != 6:
+        raise ValueError(f"expected #RRGGBB, got {text!r}")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def load_palette(path):
+    """Read a ``Palette`` from a colors.toml-style theme file.
+
+    Roles whose key (see ``PALETTE_KEYS``) is missing keep the default
+    color.  The palette is named after the file, or after its directory
+    when the file is a theme's ``colors.toml``.
+    """
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == "colors":
+        stem = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    colors = {role: _hex_color(data[key]) for role, key in PALETTE_KEYS.items() if key in data}
+    return Palette(stem, **colors)
+
+
+def recolor(img, palette):
+    """``img``, rendered for the stock palette, roughly as drawn for ``palette``."""
+    return img.convert("RGB", palette.matrix())
+
+
+def recolor_outputs(wallpapers, out_dir, palette, encoder=ENCODERS["default"], span=False,
+                    size=(W, H)):
+    """Recolor every file the manifest lists for ``wallpapers`` into ``out_dir/<palette>/``.
+
+    Variants and span slices are recolored like the main image, which is
+    looked up at ``size`` (see ``output_file``); nothing is rendered again.  Returns the relative paths written.
+    """
+    manifest = load_manifest(out_dir)
+    relpaths = [relpath for wp in wallpapers
+                for relpath in manifest.get(os.path.join(SPAN_DIR, wp.filename) if span
+                                            else output_file(wp, size), {}).get("files", {})]
+
+    def convert(relpath):
+        target = os.path.join(out_dir, palette.name, relpath)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with Image.open(os.path.join(out_dir, relpath)) as img:
+            encoder.save(recolor(img.convert("RGB"), palette), target)
+        return os.path.join(palette.name, relpath)
+
+    if not relpaths:
+        return []
+    workers = min(len(relpaths), os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(convert, relpaths))
+
+
+# ─────────────────────────────────────────────────────────────
+# Render daemon — warm workers answering over a Unix socket
+# ─────────────────────────────────────────────────────────────
+def _daemon_init(glyphs, size):
+    """Pool initializer: parse the fonts for ``size`` and take the shared glyph masks once."""
+    # Leave the daemon's process group: Ctrl-C or a group SIGTERM would kill
+    # an idle worker holding the pool's queue lock and hang its shutdown.
+    os.setpgrp()
+    ctx = RenderContext(*size)
+    for font_size in FONT_SIZES:
+        ctx.font(font_size)
+    GLYPHS.load(glyphs)
+
+
+def _daemon_render(task):
+    """Render one daemon request in a warm worker and return its response."""
+    request, glyphs = task
+    wp = find_wallpaper(request["wallpaper"])
+    if "seed" in request:
+        wp = replace(wp, seed=int(request["seed"]))
+    size = parse_size(request.get("size", f"{W}x{H}"))
+    encoder = ENCODERS[request.get("encoder", "fast")]
+    out_dir, filename = os.path.split(os.path.abspath(request["output"]))
+    start = time.perf_counter()
+    img = wp.render(size, bool(request.get("exact", True)))
+    written = export(img, filename, out_dir, (), encoder)
+    GLYPHS.save(glyphs)
+    return {"output": os.path.join(out_dir, *written),
+            "seconds": round(time.perf_counter() - start, 3)}
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """One client connection: a JSON request per line, a JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                task = (json.loads(line), self.server.glyphs)
+                response = self.server.pool.apply(_daemon_render, (task,))
+            except Exception as exc:  # reported to the client, the daemon carries on
+                response = {"error": f"{type(exc).__name__}: {exc}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class RenderDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket server handing render requests to a pool of warm workers.
+
+    Each connection gets a thread; requests queue on the pool, so
+    ``jobs`` renders run at once and the rest wait their turn.  Workers
+    live as long as the daemon, so the imports, parsed fonts, glyph atlas
+    and blend ramps of earlier requests are already there for the next.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, jobs, glyphs, size=(W, H)):
+        super().__init__(path, _DaemonHandler)
+        os.chmod(path, 0o600)
+        self.glyphs = glyphs
+        self.pool = multiprocessing.Pool(jobs, _daemon_init, (glyphs, size))
+
+    def server_close(self):
+        super().server_close()
+        self.pool.terminate()
+        os.unlink(self.server_address)
+
+
+def serve(path, jobs, glyphs, size=(W, H)):
+    """Answer render requests on the Unix socket ``path`` until interrupted.
+
+    A request is one line of JSON: ``wallpaper`` (slug) and ``output``
+    (file path; the encoder's extension replaces its own), plus optional
+    ``seed`` (default: the wallpaper's), ``size`` (``WxH``), ``encoder``
+    (default ``fast``) and ``exact``.  The response line holds the
+    ``output`` written and the ``seconds`` it took, or an ``error``.
+    The workers parse the fonts for ``size`` before the first request.
+    """
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)  # left behind by a daemon that died
+            else:
+                raise OSError(f"a daemon is already listening on {path}")
+    server = RenderDaemon(path, jobs, glyphs, size)
+    # Stop the loop from another thread rather than raising wherever the
+    # signal happens to land.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def send(path, request):
+    """Send one render request to the daemon on ``path`` and return its response."""
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(path)
+        with sock.makefile("rwb") as f:
+            f.write(json.dumps(request).encode() + b"\n")
+            f.flush()
+            return json.loads(f.readline())
+
+
+# ─────────────────────────────────────────────────────────────
+# Golden checks — renders compared against stored fingerprints
+# ─────────────────────────────────────────────────────────────
+GOLDEN = "golden.json"
+GOLDEN_DIR = ".golden"
+GOLDEN_VERSION = 2
+
+
+def pixel_hash(img):
+    """Exact hash of the decoded pixels (independent of PNG encoding)."""
+    return hashlib.sha256(img.tobytes()).hexdigest()
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    m = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    m[0] /= math.sqrt(2)
+    return m
+
+
+def perceptual_hash(img):
+    """64-bit DCT perceptual hash of ``img`` as 16 hex digits.
+
+    The image is reduced to 32x32 luma; the sign of each of the lowest 8x8
+    DCT coefficients (DC excluded) against their median is one bit.
+    """
+    small = np.asarray(img.convert("L").resize((32, 32), Image.BOX), dtype=np.float64)
+    d = _dct_matrix(32)
+    low = (d @ small @ d.T)[:8, :8].ravel()[1:]
+    bits = low > np.median(low)
+    return f"{int(''.join('1' if b else '0' for b in bits), 2):016x}"
+
+
+def hash_distance(a, b):
+    """Hamming distance between two ``perceptual_hash`` values."""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def diff_heatmap(img, ref):
+    """Dimmed reference with every differing pixel lit, brighter the larger the error."""
+    diff = np.abs(np.asarray(img, dtype=np.int16) - np.asarray(ref, dtype=np.int16)).max(axis=2)
+    base = np.asarray(ref.convert("L"), dtype=np.uint16) // 4
+    heat = np.where(diff > 0, np.minimum(64 + diff.astype(np.uint16) * 16, 255), 0)
+    return Image.fromarray(np.stack([np.maximum(base, heat), base, base], axis=2).astype(np.uint8))
+
+
+def _reference(wp, golden_dir, entry, size):
+    """The reference image of ``wp`` whose pixels are the golden ones, or None.
+
+    The shipped wallpaper in ``BACKGROUNDS`` is tried after the local copy
+    in ``golden_dir``, so a fresh clone can still diff against it.
+    """
+    for path in (os.path.join(golden_dir, wp.filename), os.path.join(BACKGROUNDS, wp.filename)):
+        try:
+            ref = Image.open(path).convert("RGB")
+        except OSError:
+            continue
+        if ref.size == tuple(size) and pixel_hash(ref) == entry["sha256"]:
+            return ref
+    return None
+
+
+def _replay_diffs(wp, size, img):
+    """Pixels of each replay of ``wp``'s recorded render that differ from ``img``.
+
+    The recording is drawn in 4 bands (``--threads``), in 256-row strips
+    (``--tile``) and as a box like one monitor of a span; each must give
+    exactly the pixels of the direct render.
+    """
+    width, height = img.size
+    full = np.asarray(img)
+    drawn = wp.render(size, record=True)
+    box = (width // 3 + 17, 0, 2 * width // 3, height // 2 + 5)
+    replays = {
+        "4 bands": (np.asarray(drawn.render(4)), full),
+        "256-row tiles": (np.vstack([np.asarray(s) for s in drawn.strips(256)]), full),
+        "box": (np.asarray(drawn.render_box(box)), full[box[1]:box[3], box[0]:box[2]]),
+    }
+    return {name: int(np.count_nonzero((a != b).any(axis=2))) for name, (a, b) in replays.items()}
+
+
+def _run_golden(task):
+    """Render one wallpaper and record or check it against its golden entry."""
+    slug, size, golden_dir, entry, tolerance, phash_tolerance, update, replay = task
+    wp = find_wallpaper(slug)
+    img = wp.render(size)
+    result = {"sha256": pixel_hash(img), "phash": perceptual_hash(img)}
+    if replay and not update:
+        diffs = {name: n for name, n in _replay_diffs(wp, size, img).items() if n}
+        if diffs:
+            note = ", ".join(f"{name} differ in {n} px" for name, n in diffs.items())
+            return slug, {**result, "status": "FAIL", "note": note}
+    if update:
+        os.makedirs(golden_dir, exist_ok=True)
+        img.save(os.path.join(golden_dir, wp.filename), "PNG", compress_level=1)
+        return slug, result
+    if entry is None:
+        return slug, {**result, "status": "new"}
+    if result["sha256"] == entry["sha256"]:
+        return slug, {**result, "status": "ok"}
+    result["phash_distance"] = hash_distance(result["phash"], entry["phash"])
+    ref = _reference(wp, golden_dir, entry, img.size)
+    if ref is None:
+        return slug, {**result, "status": "FAIL", "note": "no reference image to diff"}
+    diff = np.abs(np.asarray(img, dtype=np.int16) - np.asarray(ref, dtype=np.int16)).max(axis=2)
+    result["max_diff"] = int(diff.max())
+    result["diff_pixels"] = int(np.count_nonzero(diff > tolerance))
+    if result["max_diff"] <= tolerance and result["phash_distance"] <= phash_tolerance:
+        return slug, {**result, "status": "close"}
+    heatmap = os.path.join(golden_dir, "diff", wp.filename)
+    os.makedirs(os.path.dirname(heatmap), exist_ok=True)
+    diff_heatmap(img, ref).save(heatmap, "PNG", compress_level=1)
+    return slug, {**result, "status": "FAIL", "note": heatmap}
+
+
+def load_golden(path):
+    try:
+        with open(path) as f:
+            golden = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if golden.get("version") != GOLDEN_VERSION:
+        return None
+    return golden
+
+
+def check_golden(wallpapers, jobs, path=GOLDEN, golden_dir=GOLDEN_DIR, tolerance=0,
+                 update=False, phash_tolerance=0, replay=False):
+    """Render ``wallpapers`` in parallel and compare them with ``path``.
+
+    Golden sets are kept per font file, since the glyphs decide most
+    pixels; checking on a machine whose font has no recorded set raises
+    ``ValueError`` rather than failing every wallpaper.  A render whose
+    pixel hash matches is ``ok``.  Otherwise it is diffed against a
+    reference image with the golden pixels (see ``_reference``): within
+    ``tolerance`` levels per channel and ``phash_tolerance`` bits of
+    perceptual hash it is ``close``, beyond either ``FAIL`` with a heatmap
+    written to ``golden_dir/diff/``.  With ``update`` the current renders
+    become the golden set for this font instead.  With ``replay`` a
+    wallpaper also fails when its banded, tiled or boxed replay differs from
+    the direct render (see ``_replay_diffs``).  Returns ``{slug: result}``.
+    """
+    golden = load_golden(path) or {}
+    font = _font_digest()
+    fonts = golden.get("fonts", {})
+    if not update and font not in fonts:
+        recorded = ", ".join(sorted(f["file"] for f in fonts.values())) or "none"
+        current = os.path.basename(resolve_font_path() or "pil-default")
+        raise ValueError(f"{path} has no golden set for {current} (recorded: {recorded}); "
+                         "record one with --update-golden")
+    size = tuple(golden.get("size", (W, H)))
+    entries = fonts[font]["wallpapers"] if not update else {}
+    tasks = [(wp.slug, size, golden_dir, entries.get(wp.filename), tolerance, phash_tolerance,
+              update, replay) for wp in wallpapers]
+    with multiprocessing.Pool(processes=min(jobs, len(tasks)), maxtasksperchild=1) as pool:
+        results = dict(pool.imap(_run_golden, tasks))
+    if update:
+        kept = fonts.get(font, {}).get("wallpapers", {})
+        kept.update({find_wallpaper(slug).filename: {"sha256": r["sha256"], "phash": r["phash"]}
+                     for slug, r in results.items()})
+        fonts[font] = {"file": os.path.basename(resolve_font_path() or "pil-default"),
+                       "wallpapers": kept}
+        with open(path, "w") as f:
+            json.dump({"version": GOLDEN_VERSION, "size": list(size), "fonts": fonts}, f,
+                      indent=2, sort_keys=True)
+            f.write("\n")
+    return results
+
+
+def print_golden(results):
+    width = max(len(slug) for slug in results)
+    for slug, r in results.items():
+        detail = ""
+        if "phash_distance" in r:
+            detail = f"  phash distance {r['phash_distance']}"
+        if "max_diff" in r:
+            detail += f", max diff {r['max_diff']}, {r['diff_pixels']} px over tolerance"
+        if "note" in r:
+            detail += f"  ({r['note']})"
+        print(f"{slug:<{width}}  {r.get('status', 'recorded'):<8}{detail}")
+
+
+# ─────────────────────────────────────────────────────────────
+# Benchmarks — render timings compared against a stored baseline
+# ─────────────────────────────────────────────────────────────
+BENCH_BASELINE = "benchmarks.json"
+BENCH_SIZES = [(1920, 1080), (W, H)]
+BENCH_VERSION = 1
+
+
+def _bench_key(slug, size):
+    return f"{slug}@{variant_dir(size)}"
+
+
+def _run_bench(task):
+    """Render one wallpaper ``repeats`` times in a fresh worker and time it.
+
+    Only the render is measured, not encoding.  Returns the median wall and
+    CPU seconds and the worker's peak RSS in MiB.
+    """
+    slug, size, repeats = task
+    wp = find_wallpaper(slug)
+    walls, cpus = [], []
+    for _ in range(repeats):
+        wall, cpu = time.perf_counter(), time.process_time()
+        wp.render(size)
+        walls.append(time.perf_counter() - wall)
+        cpus.append(time.process_time() - cpu)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return _bench_key(slug, size), {
+        "wall": statistics.median(walls),
+        "cpu": statistics.median(cpus),
+        "peak_mib": peak,
+    }
+
+
+def bench(wallpapers, sizes=BENCH_SIZES, repeats=3, jobs=1):
+    """Benchmark ``wallpapers`` at each of ``sizes``.
+
+    Each (wallpaper, size) pair runs in its own worker process so the peak
+    RSS is its own; ``jobs`` defaults to 1 because concurrent workers skew
+    each other's wall times.
+    """
+    tasks = [(wp.slug, tuple(size), repeats) for wp in wallpapers for size in sizes]
+    with multiprocessing.Pool(processes=min(jobs, len(tasks)), maxtasksperchild=1) as pool:
+        return dict(pool.imap(_run_bench, tasks))
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if baseline.get("version") != BENCH_VERSION:
+        return {}
+    return baseline.get("results", {})
+
+
+def save_baseline(path, results, repeats):
+    with open(path, "w") as f:
+        json.dump({"version": BENCH_VERSION, "repeats": repeats, "results": results}, f,
+                  indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def regressions(results, baseline, threshold):
+    """Keys of ``results`` whose wall, CPU or peak memory grew past ``threshold``.
+
+    ``threshold`` is a fraction: 0.15 flags anything more than 15% worse
+    than its baseline entry.  Entries missing from the baseline are skipped.
+    """
+    flagged = {}
+    for key, st in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        worse = [metric for metric in ("wall", "cpu", "peak_mib")
+                 if base.get(metric) and st[metric] > base[metric] * (1 + threshold)]
+        if worse:
+            flagged[key] = worse
+    return flagged
+
+
+def print_bench(results, baseline, flagged):
+    """Print each benchmark with its change against the baseline."""
+    width = max(len(key) for key in results)
+    print()
+    print(f"{'wallpaper@size':<{width}}  {'wall':>8}  {'cpu':>8}  {'peak RSS':>10}  "
+          f"{'vs baseline':>12}")
+    for key, st in results.items():
+        base = baseline.get(key)
+        delta = f"{st['wall'] / base['wall'] - 1:>+11.0%}" if base else f"{'new':>11}"
+        mark = "  REGRESSED: " + ", ".join(flagged[key]) if key in flagged else ""
+        print(f"{key:<{width}}  {st['wall']:>7.3f}s  {st['cpu']:>7.3f}s  "
+              f"{st['peak_mib']:>6.1f} MiB  {delta}{mark}")
+
+
+def print_list():
+    for wp in WALLPAPERS:
+        print(f"{wp.number:>3}  {wp.slug:<22} seed={wp.seed:<5} {wp.filename}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("wallpapers", nargs="*", metavar="WALLPAPER",
+                        help="number, slug or glob to build (default: all)")
+    parser.add_argument("-l", "--list", action="store_true",
+                        help="list the available wallpapers and exit")
+    parser.add_argument("-j", "--jobs", type=int,
+                        help="number of worker processes (default: all cores, or 1 with --bench)")
+    parser.add_argument("-o", "--output-dir", default=BACKGROUNDS,
+                        help="directory to write the images to (default: %(default)s)")
+    parser.add_argument("-s", "--size", type=parse_size, default=f"{W}x{H}", metavar="WxH",
+                        help="output resolution, any aspect ratio; sizes other than the "
+                             "default are written to OUTPUT_DIR/WxH/ (default: %(default)s)")
+    parser.add_argument("--variants", type=parse_sizes, default=[], metavar="WxH,...",
+                        help="also write these sizes, resampled from the one render, "
+                             "to OUTPUT_DIR/WxH/ (e.g. 2560x1440,1920x1080,480x270)")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="rebuild even if the manifest says a wallpaper is up to date")
+    parser.add_argument("-e", "--encoder", choices=ENCODERS,
+                        help="output profile: fast (zlib 1), default (PIL optimize), release "
+                             "(optimize + oxipng/optipng if installed), webp or qoi "
+                             "(lossless) (default: default; with --send, the daemon's fast)")
+    parser.add_argument("--trace", metavar="DIR",
+                        help="rebuild and write each wallpaper's per-phase time and draw "
+                             "calls to DIR/<slug>.json, plus DIR/trace.folded for flamegraph.pl")
+    parser.add_argument("--span", type=parse_layout, metavar="WxH[+X+Y],...",
+                        help="render each wallpaper once across this monitor layout and "
+                             "write one file per monitor to OUTPUT_DIR/span/; monitors "
+                             "without an offset sit right of the previous one")
+    parser.add_argument("--bezel", type=int, default=0, metavar="PX",
+                        help="hidden pixels between adjacent monitors of --span "
+                             "(default: %(default)s)")
+    parser.add_argument("--tile", type=int, metavar="ROWS",
+                        help="draw and encode each PNG in strips of ROWS rows so memory "
+                             "stays bounded at large sizes (e.g. 7680x4320); same pixels, "
+                             "no variants")
+    parser.add_argument("--threads", type=int, default=1, metavar="N",
+                        help="draw each wallpaper as N horizontal bands on N threads, "
+                             "for lower latency per wallpaper; same pixels "
+                             "(default: %(default)s)")
+    parser.add_argument("--set", type=parse_option, action="append", default=[],
+                        metavar="NAME=VALUE", dest="options",
+                        help="pass a keyword to every selected generator that takes it, "
+                             "e.g. nodes=12000 for the circuit board at 7680x4320; "
+                             "may be repeated")
+    parser.add_argument("--palette", metavar="TOML",
+                        help="also write every output recolored with this colors.toml-style "
+                             "theme to OUTPUT_DIR/<theme name>/, from the existing renders")
+    golden_group = parser.add_argument_group("golden checks")
+    golden_group.add_argument("--verify", action="store_true",
+                              help="render and compare with the golden fingerprints instead of "
+                                   "building; exits non-zero on any difference")
+    golden_group.add_argument("--update-golden", action="store_true",
+                              help="record the current renders as the golden set")
+    golden_group.add_argument("--golden", default=GOLDEN,
+                              help="fingerprint file (default: %(default)s)")
+    golden_group.add_argument("--golden-dir", default=GOLDEN_DIR,
+                              help="reference PNGs and failure heatmaps (default: %(default)s)")
+    golden_group.add_argument("--tolerance", type=int, default=0,
+                              help="per-channel difference still accepted as close "
+                                   "(default: %(default)s)")
+    golden_group.add_argument("--phash-tolerance", type=int, default=2, metavar="BITS",
+                              help="perceptual-hash distance still accepted as close "
+                                   "(default: %(default)s)")
+    golden_group.add_argument("--replay", action="store_true",
+                              help="with --verify, also require --threads, --tile and --span "
+                                   "replays of each render to give the same pixels")
+    daemon_group = parser.add_argument_group("render daemon")
+    daemon_group.add_argument("--serve", metavar="SOCKET",
+                              help="keep JOBS warm workers running and render requests "
+                                   "sent to this Unix socket until interrupted; fonts are "
+                                   "loaded for --size up front")
+    daemon_group.add_argument("--send", metavar="SOCKET",
+                              help="have the daemon on SOCKET render one WALLPAPER at --size "
+                                   "to --file, and print the path written")
+    daemon_group.add_argument("--seed", type=int,
+                              help="seed for --send (default: the wallpaper's own)")
+    daemon_group.add_argument("--file", metavar="PATH",
+                              help="output file for --send; the encoder sets the extension")
+    live_group = parser.add_argument_group("live mode")
+    live_group.add_argument("--live", action="store_true",
+                            help="animate one rain wallpaper (%s) and stream raw RGB24 frames "
+                                 "at --size instead of building" % ", ".join(LIVE))
+    live_group.add_argument("--fps", type=float, default=30,
+                            help="target frame rate (default: %(default)s)")
+    live_group.add_argument("--frames", type=int,
+                            help="stop after this many frames (default: run until the reader "
+                                 "closes)")
+    live_group.add_argument("--live-output", default="-", metavar="PATH",
+                            help="file or FIFO to write frames to (default: stdout)")
+    bench_group = parser.add_argument_group("benchmarks")
+    bench_group.add_argument("--bench", action="store_true",
+                             help="time the renders instead of building, and compare them "
+                                  "with the baseline")
+    bench_group.add_argument("--bench-sizes", type=parse_sizes, metavar="WxH,...",
+                             default=",".join(variant_dir(size) for size in BENCH_SIZES),
+                             help="sizes to benchmark at (default: %(default)s)")
+    bench_group.add_argument("--repeats", type=int, default=3,
+                             help="renders per wallpaper and size; the median counts "
+                                  "(default: %(default)s)")
+    bench_group.add_argument("--baseline", default=BENCH_BASELINE,
+                             help="baseline JSON to compare with (default: %(default)s)")
+    bench_group.add_argument("--threshold", type=float, default=0.15,
+                             help="flag anything this fraction worse than the baseline "
+                                  "(default: %(default)s)")
+    bench_group.add_argument("--save-baseline", action="store_true",
+                             help="write the results to the baseline file")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print_list()
+        return 0
+    try:
+        wallpapers = select(args.wallpapers)
+        if args.options:
+            wallpapers = with_options(wallpapers, dict(args.options))
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.options and (args.verify or args.update_golden or args.bench or args.live
+                         or args.serve or args.send):
+        parser.error("--set applies to builds only")
+
+    if args.live:
+        if len(wallpapers) != 1 or wallpapers[0].slug not in LIVE:
+            parser.error(f"--live needs exactly one of: {', '.join(LIVE)}")
+        if args.live_output == "-" and sys.stdout.isatty():
+            parser.error("refusing to write raw frames to a terminal; pipe them into a player")
+        times = live(wallpapers[0], args.size, args.fps, args.frames, args.live_output)
+        if times:
+            ms = sorted(t * 1000 for t in times)
+            print(f"{len(ms)} frames, update {statistics.median(ms):.1f} ms median, "
+                  f"{ms[int(len(ms) * 0.99)]:.1f} ms p99", file=sys.stderr)
+        return 0
+
+    if args.serve:
+        jobs = max(1, args.jobs or os.cpu_count() or 1)
+        print(f"Rendering requests on {args.serve} with {jobs} workers", file=sys.stderr)
+        try:
+            serve(args.serve, jobs, os.path.join(args.output_dir, GLYPH_CACHE), args.size)
+        except OSError as exc:
+            parser.error(str(exc))
+        return 0
+
+    if args.send:
+        if len(wallpapers) != 1 or not args.file:
+            parser.error("--send needs exactly one WALLPAPER and --file")
+        request = {"wallpaper": wallpapers[0].slug, "size": variant_dir(args.size),
+                   "output": os.path.abspath(args.file)}
+        if args.encoder:
+            request["encoder"] = args.encoder
+        if args.seed is not None:
+            request["seed"] = args.seed
+        try:
+            response = send(args.send, request)
+        except OSError as exc:
+            parser.error(f"--send: {exc}")
+        if "error" in response:
+            print(response["error"], file=sys.stderr)
+            return 1
+        print(response["output"])
+        return 0
+
+    if args.verify or args.update_golden:
+        try:
+            results = check_golden(wallpapers, max(1, args.jobs or os.cpu_count() or 1),
+                                   args.golden, args.golden_dir, args.tolerance,
+                                   args.update_golden, args.phash_tolerance, args.replay)
+        except ValueError as exc:
+            print(f"error: {exc}", file=sys.stderr)
+            return 1
+        print_golden(results)
+        if args.update_golden:
+            print(f"Saved {args.golden} and reference images in {args.golden_dir}/")
+            return 0
+        failed = [slug for slug, r in results.items() if r["status"] in ("FAIL", "new")]
+        if failed:
+            print(f"{len(failed)} of {len(results)} differ from {args.golden}")
+            return 1
+        print(f"All {len(results)} match {args.golden}")
+        return 0
+
+    if args.bench:
+        results = bench(wallpapers, args.bench_sizes, max(1, args.repeats), max(1, args.jobs or 1))
+        baseline = load_baseline(args.baseline)
+        flagged = regressions(results, baseline, args.threshold)
+        print_bench(results, baseline, flagged)
+        if args.save_baseline:
+            save_baseline(args.baseline, {**baseline, **results}, args.repeats)
+            print(f"Saved {args.baseline}")
+        elif flagged:
+            print(f"{len(flagged)} regressed more than {args.threshold:.0%} "
+                  f"against {args.baseline}")
+            return 1
+        return 0
+
+    encoder = ENCODERS[args.encoder or "default"]
+    if args.tile is not None:
+        if args.tile <= 0:
+            parser.error("--tile needs a positive number of rows")
+        if args.variants:
+            parser.error("--tile cannot write --variants; build them in a separate run")
+        if encoder.format != "PNG":
+            parser.error(f"--tile writes PNG only, not {encoder.name}")
+        if args.threads > 1:
+            parser.error("--tile draws strip by strip; it cannot use --threads")
+    if args.threads <= 0:
+        parser.error("--threads needs a positive number")
+    span = with_bezels(args.span, args.bezel) if args.span else ()
+    if span and (args.variants or args.trace):
+        parser.error("--span cannot be combined with --variants or --trace")
+    palette = None
+    if args.palette:
+        try:
+            palette = load_palette(args.palette)
+        except (OSError, ValueError) as exc:
+            parser.error(f"--palette: {exc}")
+    if encoder.optimizers and not encoder.optimizer():
+        names = "/".join(argv[0] for argv in encoder.optimizers)
+        print(f"note: no {names} on PATH; {encoder.name} writes PIL's optimized PNG only",
+              file=sys.stderr)
+
+    start = time.perf_counter()
+    jobs = max(1, args.jobs or os.cpu_count() or 1)
+    rows, fresh = build(wallpapers, jobs, args.output_dir, args.force, args.size, args.variants,
+                        True, encoder, args.trace, args.tile, span,
+                        args.threads)
+    if rows:
+        print_report(rows, time.perf_counter() - start)
+        print_files(rows, encoder)
+    if args.trace:
+        print(f"Wrote phase traces to {args.trace}/")
+    if palette:
+        recolored = recolor_outputs(wallpapers, args.output_dir, palette, encoder, bool(span),
+                                    args.size)
+        print(f"Recolored {len(recolored)} files to {os.path.join(args.output_dir, palette.name)}/")
+    print(f"Done! Generated {len(rows)} wallpapers, {len(fresh)} up to date "
+          f"in {time.perf_counter() - start:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())